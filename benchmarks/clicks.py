@@ -0,0 +1,75 @@
+"""
+Per-click cost of the question page — python -m benchmarks.clicks
+Runs app.py under a real `streamlit run` server and drives --sessions
+concurrent websocket sessions (benchmarks.stclient) through Start, then
+--rounds of "pick an answer" + "Next". For each kind of click it
+reports what the server sends back (bytes, messages, deltas per click),
+client-side latency, and the server's CPU time per click from /proc,
+measured over every session's click at once. Prints JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+
+from .stclient import Session, StreamlitServer
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+async def _phase(server, sessions, action, samples):
+    """Run one click on every session concurrently; append (rerun, cpu share) per session."""
+    cpu = server.cpu_seconds()
+    reruns = await asyncio.gather(*(action(s) for s in sessions))
+    share = (server.cpu_seconds() - cpu) / len(sessions)
+    samples.extend((r, share) for r in reruns)
+
+
+def _summary(samples):
+    reruns = [r for r, _ in samples]
+    return {
+        "clicks": len(samples),
+        "bytes": round(statistics.fmean(r.bytes for r in reruns), 1),
+        "messages": round(statistics.fmean(r.messages for r in reruns), 1),
+        "deltas": round(statistics.fmean(r.deltas for r in reruns), 1),
+        "latency_ms": round(statistics.fmean(r.seconds for r in reruns) * 1e3, 2),
+        "server_cpu_ms": round(statistics.fmean(c for _, c in samples) * 1e3, 2),
+    }
+
+
+async def run(server, sessions, rounds):
+    answer, advance = [], []
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(Session(server.url)) for _ in range(sessions)]
+        await asyncio.gather(*(c.rerun() for c in clients))
+        await asyncio.gather(*(c.click("Start 25 questions") for c in clients))
+        for i in range(rounds):
+            await _phase(server, clients, lambda c: c.choose("Choose one:", i % 5), answer)
+            await _phase(server, clients, lambda c: c.click("Next"), advance)
+    return {"sessions": sessions, "rounds": rounds, "answer": _summary(answer), "next": _summary(advance)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.clicks")
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent browser sessions")
+    parser.add_argument("--rounds", type=int, default=20, help="answer + Next clicks per session (< 25)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"WEATHER_RUN_STORE": os.path.join(tmp, "runs.sqlite3")}
+        with StreamlitServer(args.app, env=env) as server:
+            time.sleep(0.5)
+            report = asyncio.run(run(server, args.sessions, min(args.rounds, 24)))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Load generator for the scoring service — python -m benchmarks.loadgen
+Opens --concurrency keep-alive connections to a running
+`python -m src.service` and fires POST /score (or /score/batch with
+--batch N) with synthetic runs for --duration seconds. Prints latency
+percentiles (p50/p90/p99/max) and throughput as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+from src.bank import QUESTION_BANK
+
+from .synthetic import respondents
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def payloads(batch, n=512, seed=0):
+    """A pool of ready-to-send request bodies across every lens."""
+    runs = []
+    for i, (lens, questions) in enumerate(QUESTION_BANK.items()):
+        runs += [{"lens": lens, "answers": a} for a in respondents(questions, n, seed=seed + i, skip=0.1)]
+    if batch:
+        return [json.dumps({"runs": runs[i:i + batch]}).encode() for i in range(0, len(runs) - batch + 1, batch)]
+    return [json.dumps(r).encode() for r in runs]
+
+
+async def worker(host, port, path, bodies, offset, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            body = bodies[i % len(bodies)]
+            i += 1
+            t = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url, concurrency, duration, batch):
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    path = "/score/batch" if batch else "/score"
+    bodies = payloads(batch)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        worker(host, port, path, bodies, k * 7, deadline, latencies, errors)
+        for k in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    lat = sorted(latencies)
+    runs = len(lat) * (batch or 1)
+    return {
+        "endpoint": path,
+        "concurrency": concurrency,
+        "batch": batch or 1,
+        "requests": len(lat),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(lat) / elapsed, 1),
+        "runs_per_s": round(runs / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(lat) * 1e3, 3) if lat else 0.0,
+            "p50": round(percentile(lat, 50) * 1e3, 3),
+            "p90": round(percentile(lat, 90) * 1e3, 3),
+            "p99": round(percentile(lat, 99) * 1e3, 3),
+            "max": round(lat[-1] * 1e3, 3) if lat else 0.0,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--batch", type=int, default=0, help="runs per /score/batch request (0 = single /score)")
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(args.url, args.concurrency, args.duration, args.batch))
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
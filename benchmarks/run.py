@@ -0,0 +1,282 @@
+"""
+Benchmarks — python -m benchmarks.run [-o results.json] [--baseline benchmarks/baseline.json] [--check]
+Micro-benchmarks for scoring, distortion sorting, lever ranking, bank
+sampling and percentile norms, plus end-to-end reruns of the setup/questions/results
+stages through Streamlit's AppTest. Every result is seconds per call (median of
+--repeat timings); with a baseline, any benchmark slower than baseline by more
+than --tolerance fails the run. --save-baseline writes the new baseline.
+Timings are machine-specific, so no baseline is committed: save one on
+the machine that gates, and pass --check there so a missing baseline
+fails the run instead of passing it.
+
+Benchmarks whose dependency is missing (numpy, streamlit) are reported
+as skipped rather than failing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+SIZES = (25, 1000, 100_000)
+E2E_STAGES = ("e2e/setup", "e2e/questions", "e2e/results")
+
+
+def measure(fn, repeat=5):
+    """Median seconds per call over `repeat` autoranged (>= 0.2 s) timings."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return statistics.median(t / number for t in timer.repeat(repeat=repeat, number=number))
+
+
+# --------------------------
+# Micro-benchmarks
+# --------------------------
+def scoring_benchmarks(lenses):
+    from src.bank import BANKS, QUESTION_BANK
+    from src.incremental import RunningScorer
+    from src.scoring import compute_scores
+
+    from .synthetic import respondents
+
+    for lens in lenses:
+        qs = QUESTION_BANK[lens]
+        bank = BANKS[lens]
+        answers = respondents(qs, 1, seed=1)[0]
+        yield f"score/dicts/{lens}", lambda qs=qs, answers=answers: compute_scores(qs, answers)
+        yield f"score/compiled/{lens}", lambda qs=qs, answers=answers, bank=bank: compute_scores(qs, answers, bank=bank)
+
+        scored = compute_scores(qs, answers)[2]
+        shuffled = random.Random(2).sample(scored, len(scored))
+        yield f"distortions/sort/{lens}", lambda shuffled=shuffled: sorted(shuffled, key=lambda t: (t[1], -t[2]))
+
+        def incremental(bank=bank, answers=answers):
+            scorer = RunningScorer(bank)
+            for qid, a in answers.items():
+                scorer.set_answer(qid, a)
+            return scorer.preview()
+        yield f"score/incremental/{lens}", incremental
+
+
+def batch_benchmarks(lenses):
+    try:
+        from src.batch import BatchScorer
+        from src.sensitivity import rank_levers
+    except ImportError:
+        return
+    from src.bank import BANKS
+    from src.scoring import compute_scores
+
+    from .synthetic import respondents
+
+    for lens in lenses:
+        bank = BANKS[lens]
+        _, per_variable, scored = compute_scores(bank.questions, respondents(bank.questions, 1, seed=1)[0])
+        yield f"levers/rank/{lens}", lambda scored=scored, per_variable=per_variable: rank_levers(scored, per_variable)
+
+        scorer = BatchScorer.from_bank(bank)
+        matrix = scorer.answer_matrix(respondents(bank.questions, 1000, seed=3))
+        yield f"score/batch1k/{lens}", lambda scorer=scorer, matrix=matrix: scorer.score(matrix)
+        yield f"levers/batch1k/{lens}", lambda scorer=scorer, matrix=matrix: scorer.levers(matrix)
+
+
+def sampling_benchmarks(lens):
+    from src.sampling import sample_positions
+
+    from .synthetic import synthetic_bank, synthetic_questions
+
+    for size in SIZES:
+        questions = synthetic_questions(lens, size)
+        bank = synthetic_bank(lens, size)
+
+        def copy_shuffle(questions=questions):
+            # the pre-compiled-bank start: copy the whole lens and shuffle it
+            qs = questions[:]
+            random.shuffle(qs)
+            return qs[:25]
+        yield f"sample/copy_shuffle/{size}", copy_shuffle
+        def positions(bank=bank):
+            return [bank.question(p) for p in random.sample(range(len(bank)), k=min(25, len(bank)))]
+        yield f"sample/positions/{size}", positions
+        yield f"sample/stratified/{size}", lambda bank=bank: sample_positions(bank, 25)
+
+
+def norms_benchmarks():
+    from src.sketch import QuantileSketch
+
+    rng = random.Random(4)
+    values = [rng.uniform(0, 100) for _ in range(100_000)]
+    sketch = QuantileSketch()
+    sketch.extend(values)
+    other = QuantileSketch()
+    other.extend(values[:10_000])
+    sketch.view()
+    yield "norms/percentile", lambda: sketch.rank(62.5)
+    yield "norms/merge", lambda: QuantileSketch.from_bytes(sketch.to_bytes()).merge(other)
+
+
+# --------------------------
+# End-to-end reruns
+# --------------------------
+def rerun_benchmarks(repeat):
+    """(name, seconds) per stage, timed around AppTest.run()."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+
+    def click(at, label):
+        next(b for b in at.button if b.label == label).click()
+
+    stages = {name: [] for name in E2E_STAGES}
+    for _ in range(repeat):
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=30)
+        t = time.perf_counter()
+        at.run()
+        stages["e2e/setup"].append(time.perf_counter() - t)
+
+        click(at, "Start 25 questions")
+        at.run()
+        for _ in range(5):
+            click(at, "Next")
+            t = time.perf_counter()
+            at.run()
+            stages["e2e/questions"].append(time.perf_counter() - t)
+
+        click(at, "Finish & Score")
+        at.run()
+        for _ in range(3):
+            # a plain rerun of the results page (e.g. any widget touch)
+            t = time.perf_counter()
+            at.run()
+            stages["e2e/results"].append(time.perf_counter() - t)
+        if at.exception:
+            raise RuntimeError(f"app raised during rerun benchmark: {at.exception[0].message}")
+    return {name: statistics.median(times) for name, times in stages.items()}
+
+
+def session_footprint():
+    """Bytes one session holds (src.session.session_bytes) mid-run and on the results page."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+    from src.session import session_bytes
+
+    def click(at, label):
+        next(b for b in at.button if b.label == label).click()
+        at.run()
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=30)
+    at.run()
+    out = {"setup": session_bytes(at.session_state._state.filtered_state)}
+    click(at, "Start 25 questions")
+    for i in range(12):
+        at.radio[0].set_value(i % 5)
+        at.run()
+        click(at, "Next")
+    out["questions"] = session_bytes(at.session_state._state.filtered_state)
+    click(at, "Finish & Score")
+    out["results"] = session_bytes(at.session_state._state.filtered_state)
+    return out
+
+
+# --------------------------
+# Baseline comparison
+# --------------------------
+def compare(results, baseline, tolerance):
+    """[(name, baseline, current, ratio)] for benchmarks slower than allowed."""
+    slow = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base and current > base * (1 + tolerance):
+            slow.append((name, base, current, current / base))
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("-o", "--output", help="write results JSON here (default stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail when there is no baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-e2e", action="store_true", help="skip the AppTest rerun timings")
+    args = parser.parse_args(argv)
+
+    # keep the app's run store out of the working tree
+    os.environ.setdefault("WEATHER_RUN_STORE", os.path.join(tempfile.mkdtemp(), "runs.sqlite3"))
+    sys.path.insert(0, ROOT)
+    from src.bank import QUESTION_BANK
+
+    lenses = tuple(QUESTION_BANK)
+    results, skipped, footprint = {}, [], {}
+    micro = [
+        *scoring_benchmarks(lenses),
+        *batch_benchmarks(lenses),
+        *sampling_benchmarks(lenses[0]),
+        *norms_benchmarks(),
+    ]
+    if not any(name.startswith("score/batch") for name, _ in micro):
+        skipped.append("score/batch1k (numpy not installed)")
+    for name, fn in micro:
+        if args.filter in name:
+            results[name] = measure(fn, repeat=args.repeat)
+            print(f"{name:40s} {results[name] * 1e6:12.2f} µs", file=sys.stderr)
+
+    if not args.no_e2e and any(args.filter in name for name in E2E_STAGES):
+        reruns = rerun_benchmarks(max(1, args.repeat // 2))
+        if not reruns:
+            skipped.append("e2e (streamlit not installed)")
+        for name, secs in reruns.items():
+            if args.filter in name:
+                results[name] = secs
+                print(f"{name:40s} {secs * 1e3:12.2f} ms", file=sys.stderr)
+        footprint = session_footprint()
+        for stage, n in footprint.items():
+            print(f"{'session/' + stage:40s} {n:12d} B", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "unit": "seconds",
+        "results": results,
+        "session_bytes": footprint,
+        "skipped": skipped,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return 2 if args.check else 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    slow = compare(results, baseline, args.tolerance)
+    for name, base, current, ratio in slow:
+        print(f"SLOWER {name}: {base * 1e6:.2f} µs -> {current * 1e6:.2f} µs ({ratio:.2f}x)", file=sys.stderr)
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
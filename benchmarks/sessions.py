@@ -0,0 +1,171 @@
+"""
+Concurrent-session load test — python -m benchmarks.sessions
+Runs app.py under a real `streamlit run` server (benchmarks.stclient)
+and, for each --levels value N, drives N websocket sessions through
+whole runs at once: load the page, pick a lens (sessions rotate through
+LENSES), Start, answer every question with an occasional Back + Next,
+Finish & Score, then "Start a new run (same lens)" for --runs runs.
+--layout form (or tabs) picks a one-page layout instead: every answer
+is set in the browser and the run costs one Submit & Score click.
+Each level gets a fresh server and store so RSS growth is its own.
+
+Per level it reports click latency percentiles (p50/p90/p99/max, every
+click counted), clicks/s, server CPU seconds, utilisation and CPU per
+completed run from /proc, and RSS growth per connected session. The knee is the first level whose
+p90 exceeds --knee-latency times the one-session p90, or whose
+throughput per session falls below --knee-efficiency of the
+one-session rate; the level before it is reported as capacity.
+--think adds jittered think time between clicks (0 = closed loop).
+Prints a table on stderr and JSON on stdout.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+
+from src.bank import LENSES
+
+from .loadgen import percentile
+from .stclient import Session, StreamlitServer
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+QUESTIONS = 25
+LAYOUTS = {"guided": 0, "form": 1, "tabs": 2}  # option index of app.py's "Question layout" radio
+
+
+async def _session(client, lens_index, layout, runs, think, rng, latencies):
+    async def step(action):
+        if think:
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+        rerun = await action
+        latencies.append(rerun.seconds)
+
+    await step(client.rerun())
+    await step(client.select("Choose a lens", lens_index))
+    if layout:
+        await step(client.choose("Question layout", layout))
+    for run in range(runs):
+        await step(client.click("Start 25 questions" if run == 0 else "Start a new run (same lens)"))
+        if layout:
+            if think:
+                await asyncio.sleep(think * QUESTIONS)  # answering happens in the browser
+            client.fill("radio", lambda widget: rng.randrange(5))
+            await step(client.click("Submit & Score"))
+            continue
+        for q in range(QUESTIONS):
+            await step(client.choose("Choose one:", rng.randrange(5)))
+            if q == QUESTIONS - 1:
+                break
+            if q and rng.random() < 0.1:
+                await step(client.click("Back"))
+                await step(client.click("Next"))
+            await step(client.click("Next"))
+        await step(client.click("Finish & Score"))
+
+
+async def _level(server, n, layout, runs, think, seed):
+    latencies = []
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(Session(server.url)) for _ in range(n)]
+        cpu, start = server.cpu_seconds(), time.perf_counter()
+        await asyncio.gather(*(
+            _session(c, i % len(LENSES), layout, runs, think, random.Random(seed + i), latencies)
+            for i, c in enumerate(clients)
+        ))
+        wall = time.perf_counter() - start
+        cpu = server.cpu_seconds() - cpu
+        rss = server.rss_bytes()  # sessions still connected
+    return latencies, wall, cpu, rss
+
+
+def run_level(app, n, layout, runs, think, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"WEATHER_RUN_STORE": os.path.join(tmp, "runs.sqlite3")}
+        with StreamlitServer(app, env=env) as server:
+            async def warm():
+                async with Session(server.url) as s:
+                    await s.rerun()
+            asyncio.run(warm())  # imports, caches and the store are not per-session cost
+            time.sleep(0.5)
+            base_rss = server.rss_bytes()
+            latencies, wall, cpu, rss = asyncio.run(_level(server, n, layout, runs, think, seed))
+    latencies.sort()
+    return {
+        "sessions": n,
+        "clicks": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1e3, 2),
+        "p90_ms": round(percentile(latencies, 90) * 1e3, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1e3, 2),
+        "max_ms": round(latencies[-1] * 1e3, 2),
+        "clicks_per_s": round(len(latencies) / wall, 1),
+        "server_cpu_s": round(cpu, 2),
+        "server_cpu_util": round(cpu / wall, 2),
+        "cpu_ms_per_run": round(cpu / (n * runs) * 1e3, 1),
+        "rss_base_mb": round(base_rss / 2**20, 1),
+        "rss_per_session_kb": round((rss - base_rss) / n / 1024, 1),
+    }
+
+
+def knee(levels, latency_factor, efficiency):
+    """(first level past the knee, last level before it); (None, last level) if there is no knee."""
+    base = levels[0]
+    rate = base["clicks_per_s"] / base["sessions"]
+    for prev, level in zip(levels, levels[1:]):
+        slow = level["p90_ms"] > latency_factor * base["p90_ms"]
+        starved = level["clicks_per_s"] / level["sessions"] < efficiency * rate
+        if slow or starved:
+            return level["sessions"], prev["sessions"]
+    return None, levels[-1]["sessions"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sessions")
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrent session counts")
+    parser.add_argument("--runs", type=int, default=2, help="full runs per session")
+    parser.add_argument("--layout", choices=LAYOUTS, default="guided", help="question layout the sessions pick")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between clicks (±50%%)")
+    parser.add_argument("--knee-latency", type=float, default=2.0, help="p90 growth over one session that marks the knee")
+    parser.add_argument("--knee-efficiency", type=float, default=0.5, help="per-session throughput share that marks the knee")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    counts = sorted({int(n) for n in args.levels.split(",")})
+    if counts[0] != 1:
+        counts.insert(0, 1)  # the baseline every level is judged against
+    levels = []
+    print(
+        f"{'sessions':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'clicks/s':>9} {'cpu':>5} {'ms/run':>7} {'KB/session':>11}",
+        file=sys.stderr,
+    )
+    for n in counts:
+        level = run_level(args.app, n, LAYOUTS[args.layout], args.runs, args.think, args.seed)
+        levels.append(level)
+        print(
+            f"{n:>8} {level['p50_ms']:>8} {level['p90_ms']:>8} {level['p99_ms']:>8} "
+            f"{level['clicks_per_s']:>9} {level['server_cpu_util']:>5} {level['cpu_ms_per_run']:>7} "
+            f"{level['rss_per_session_kb']:>11}",
+            file=sys.stderr,
+        )
+    past, capacity = knee(levels, args.knee_latency, args.knee_efficiency)
+    report = {
+        "layout": args.layout,
+        "runs_per_session": args.runs,
+        "think_s": args.think,
+        "cpus": os.cpu_count(),
+        "levels": levels,
+        "knee": past,
+        "capacity_sessions": capacity,
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
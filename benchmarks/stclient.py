@@ -0,0 +1,219 @@
+"""
+Minimal Streamlit websocket client for measurements
+Speaks the same protobuf stream as the browser (BackMsg out, ForwardMsg
+in) so benchmarks can click buttons and pick radio/selectbox options on
+a real `streamlit run` server and count what comes back: bytes and
+messages per rerun, and the server process's CPU time. Widget clicks
+inside an st.fragment send that fragment's id, as the browser does, and
+values the script sets through st.session_state replace the ones the
+client would otherwise resend.
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+@dataclass
+class Rerun:
+    """What one rerun sent back."""
+    bytes: int
+    messages: int
+    deltas: int
+    seconds: float
+
+
+def process_cpu_seconds(pid):
+    """user + system CPU of a process (and its threads) from /proc."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+
+def process_rss_bytes(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StreamlitServer:
+    """`streamlit run <script>` on a loopback port, for the duration of a with-block."""
+
+    def __init__(self, script, port=None, env=None):
+        self.script = script
+        self.port = port or free_port()
+        self.env = {**os.environ, **(env or {})}
+        self.proc = None
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", self.script,
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false",
+             "--server.fileWatcherType", "none"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=self.env,
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.5).close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"streamlit did not start on port {self.port}")
+
+    def __exit__(self, *exc):
+        if self.proc:
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def cpu_seconds(self):
+        return process_cpu_seconds(self.proc.pid)
+
+    def rss_bytes(self):
+        return process_rss_bytes(self.proc.pid)
+
+
+class Session:
+    """One browser-like session. Keeps the latest element per delta path."""
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        self.elements = {}   # delta path -> (Element, fragment_id)
+        self.widgets = {}    # widget id -> WidgetState to resend (current values)
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def rerun(self, widget=None, fragment_id="", timeout=30):
+        """Send one rerun_script (optionally carrying a changed widget) and wait until the page settles."""
+        msg = BackMsg()
+        states = msg.rerun_script.widget_states
+        for wid, state in self.widgets.items():
+            if widget is None or wid != widget.id:
+                states.widgets.add().CopyFrom(state)
+        if widget is not None:
+            states.widgets.add().CopyFrom(widget)
+        msg.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+
+        total = messages = deltas = 0
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), timeout)
+            total += len(raw)
+            messages += 1
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta":
+                deltas += 1
+                if fwd.delta.WhichOneof("type") == "new_element":
+                    path = tuple(fwd.metadata.delta_path)
+                    self.elements[path] = (fwd.delta.new_element, fwd.delta.fragment_id)
+                    self._sync(fwd.delta.new_element)
+            elif kind == "new_session":
+                if not fragment_id:
+                    self.elements.clear()
+            elif kind == "script_finished":
+                # an st.rerun() inside the script finishes early and starts over
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    if not fragment_id:
+                        self._prune()
+                    break
+        return Rerun(total, messages, deltas, time.perf_counter() - start)
+
+    # --------------------------
+    # Widgets
+    # --------------------------
+    def _sync(self, element):
+        """Adopt a value the script set (set_value), as the browser does."""
+        kind = element.WhichOneof("type")
+        if kind not in ("radio", "selectbox"):
+            return
+        widget = getattr(element, kind)
+        if widget.set_value and widget.id in self.widgets:
+            if widget.HasField("raw_value"):
+                self.widgets[widget.id].string_value = widget.raw_value
+            else:
+                del self.widgets[widget.id]
+
+    def _prune(self):
+        """Forget widgets the last full run did not draw (the browser unmounts them)."""
+        live = {
+            getattr(e, kind).id
+            for e, _ in self.elements.values()
+            if (kind := e.WhichOneof("type")) in ("radio", "selectbox")
+        }
+        for wid in [w for w in self.widgets if w not in live]:
+            del self.widgets[wid]
+
+    def find(self, kind, label):
+        """(element proto of `kind`, fragment_id) for the widget with this label."""
+        for element, fragment_id in reversed(list(self.elements.values())):
+            if element.WhichOneof("type") == kind and getattr(element, kind).label == label:
+                return getattr(element, kind), fragment_id
+        raise LookupError(f"no {kind} labelled {label!r} on the page")
+
+    async def click(self, label):
+        button, fragment_id = self.find("button", label)
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = button.id
+        state.trigger_value = True
+        return await self.rerun(state, fragment_id)
+
+    async def _pick(self, kind, label, option_index):
+        widget, fragment_id = self.find(kind, label)
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = widget.id
+        state.string_value = widget.options[option_index]
+        self.widgets[widget.id] = state
+        return await self.rerun(state, fragment_id)
+
+    def fill(self, kind, pick):
+        """
+        Set every `kind` widget inside a form to options[pick(widget)]
+        without a rerun, as the browser does; the form's submit click
+        sends them all.
+        """
+        for element, _ in self.elements.values():
+            if element.WhichOneof("type") == kind and getattr(element, kind).form_id:
+                widget = getattr(element, kind)
+                state = BackMsg().rerun_script.widget_states.widgets.add()
+                state.id = widget.id
+                state.string_value = widget.options[pick(widget)]
+                self.widgets[widget.id] = state
+
+    async def choose(self, label, option_index):
+        return await self._pick("radio", label, option_index)
+
+    async def select(self, label, option_index):
+        return await self._pick("selectbox", label, option_index)
@@ -0,0 +1,31 @@
+"""
+Synthetic inputs for the benchmarks
+Banks of any size built by cycling a real lens (fresh ids, same
+variable/weight/reverse mix), and seeded random respondents for them.
+"""
+
+import random
+
+from src.bank import QUESTION_BANK, compile_lens
+
+
+def synthetic_questions(lens: str, size: int):
+    base = QUESTION_BANK[lens]
+    return [
+        {**base[i % len(base)], "id": f"{base[i % len(base)]['id']}_{i}"}
+        for i in range(size)
+    ]
+
+
+def synthetic_bank(lens: str, size: int):
+    return compile_lens(f"{lens}/{size}", synthetic_questions(lens, size))
+
+
+def respondents(questions, n: int, seed: int = 0, skip: float = 0.0):
+    """n answer dicts (qid -> 0..4); each question skipped with probability `skip`."""
+    rng = random.Random(seed)
+    ids = [q["id"] for q in questions]
+    return [
+        {qid: rng.randint(0, 4) for qid in ids if rng.random() >= skip}
+        for _ in range(n)
+    ]
@@ -0,0 +1,82 @@
+import time
+
+import streamlit as st
+
+from src import rollups
+from src.engine import BANKS, VARIABLE_WEIGHTS, shared_store
+
+# ==========================
+# Ops Dashboard
+# Reads only the rollup tables the run store keeps current, so a page
+# load costs a handful of indexed rows per day, not a scan of all runs.
+# Listed and served only with WEATHER_OPS_PAGES=1 (see app.py).
+# ==========================
+st.set_page_config(page_title="Run Dashboard", layout="wide")
+st.title("Run Dashboard")
+
+WINDOWS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+
+@st.cache_resource
+def run_store():
+    return shared_store()
+
+with st.sidebar:
+    lens = st.selectbox("Lens", tuple(BANKS))
+    window = st.radio("Window", tuple(WINDOWS))
+
+days = WINDOWS[window]
+since_day = rollups.day_of(time.time() - (days - 1) * 86400) if days else None
+
+conn = run_store().reader()
+summary = rollups.variable_summary(conn, lens, since_day=since_day)
+overall = summary.pop(rollups.OVERALL, None)
+
+if overall is None:
+    st.info("No finished runs for this lens in the selected window yet.")
+    st.stop()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Runs", f"{overall['n']:,}")
+col2.metric("Mean overall", f"{overall['mean']:.1f}")
+col3.metric("RED share", f"{overall['red'] / overall['n']:.0%}")
+
+# --------------------------
+# Per variable
+# --------------------------
+st.write("### Variables")
+ordered = [v for v in VARIABLE_WEIGHTS if v in summary] + [v for v in summary if v not in VARIABLE_WEIGHTS]
+st.dataframe(
+    [
+        {
+            "Variable": v,
+            "Runs": info["n"],
+            "Mean": round(info["mean"], 1),
+            "Stdev": round(info["stdev"], 1),
+            "RED": f"{info['red'] / info['n']:.0%}",
+            "YELLOW": f"{info['yellow'] / info['n']:.0%}",
+            "GREEN": f"{info['green'] / info['n']:.0%}",
+        }
+        for v, info in ((v, summary[v]) for v in ordered)
+    ],
+    hide_index=True,
+    width="stretch",
+)
+
+st.write("### Score distribution")
+variable = st.selectbox("Score", (rollups.OVERALL, *ordered))
+counts = rollups.score_histogram(conn, lens, variable, since_day=since_day)
+w = rollups.BUCKET_WIDTH
+st.bar_chart({f"{b * w:>3}–{b * w + w}": n for b, n in enumerate(counts)})
+
+# --------------------------
+# Levers
+# --------------------------
+st.write("### Most frequent \"Smallest lever\"")
+bank = BANKS[lens]
+levers = rollups.top_levers(conn, lens, since_day=since_day)
+if not levers:
+    st.caption("No levers recorded yet.")
+for qid, n in levers:
+    pos = bank.index.get(qid)
+    text = bank.texts[pos] if pos is not None else qid
+    st.write(f"- **{n:,}×** {text}  \n  ↳ {bank.variable(pos) if pos is not None else '?'}")
@@ -0,0 +1,77 @@
+import os
+
+import streamlit as st
+
+from src.engine import metrics
+
+# ==========================
+# Admin: this process's metrics
+# The in-app sink: reads src.metrics' registry directly, so it shows the
+# Streamlit server process only (JSON/Prometheus sinks cover the rest).
+# Listed and served only with WEATHER_OPS_PAGES=1 (see app.py).
+# ==========================
+st.set_page_config(page_title="Admin", layout="wide")
+st.title("Admin")
+
+if not metrics.ENABLED:
+    st.info(
+        "Metrics are off. Start the app with `WEATHER_METRICS=panel` (or `json:-`, "
+        "`prom:/path/weather.prom`, comma-separated) to collect them."
+    )
+else:
+    snap = metrics.snapshot()
+    gauges, counters, summaries = snap["gauges"], snap["counters"], snap["summaries"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Active sessions", gauges.get("sessions.active", 0))
+    col2.metric("Sessions started", counters.get("sessions.started", 0))
+    col3.metric("Full reruns", sum(n for name, n in counters.items() if name.startswith("rerun.")))
+    bytes_ = summaries.get("session.bytes")
+    col4.metric("Session state (mean)", f"{bytes_['mean'] / 1024:.1f} KB" if bytes_ else "–")
+
+    st.write("### Timers")
+    st.dataframe(
+        [
+            {
+                "Timer": name[: -len(".seconds")],
+                "Calls": s["count"],
+                "Mean (ms)": round(s["mean"] * 1e3, 3),
+                "Max (ms)": round(s["max"] * 1e3, 3),
+                "Total (s)": round(s["sum"], 3),
+            }
+            for name, s in sorted(summaries.items())
+            if name.endswith(".seconds")
+        ],
+        hide_index=True,
+        width="stretch",
+    )
+
+    st.write("### Counters and gauges")
+    st.dataframe(
+        [{"Name": name, "Value": value} for name, value in sorted({**counters, **gauges}.items())],
+        hide_index=True,
+        width="stretch",
+    )
+    if st.button("Refresh"):
+        st.rerun()
+
+# --------------------------
+# Profiles
+# --------------------------
+st.write("### Profiles")
+if not metrics.PROFILE_EVERY:
+    st.caption("Profiler off. `WEATHER_PROFILE=cpu:50` (cProfile) or `mem:50` (tracemalloc) samples every 50th rerun.")
+else:
+    out = metrics.profile_dir()
+    files = sorted(os.listdir(out), reverse=True)[:20] if os.path.isdir(out) else []
+    st.caption(f"{metrics.PROFILE_MODE} profile every {metrics.PROFILE_EVERY} reruns → `{out}`")
+    if not files:
+        st.caption("No profiles written yet.")
+    for name in files:
+        path = os.path.join(out, name)
+        if name.endswith(".txt"):
+            with st.expander(name):
+                with open(path, encoding="utf-8") as f:
+                    st.code(f.read(), language=None)
+        else:
+            st.write(f"- `{name}` — `python -m pstats {path}`")
@@ -0,0 +1,149 @@
+"""
+Adaptive question flow — ask only what can still move a zone
+For the questions sampled into a run, each variable's final pct (what
+compute_scores would give if every sampled question were answered) is
+modelled as the answered weighted mean plus the unanswered weights times
+an unknown 0..4 score. The score variance is the variable's observed
+spread shrunk toward a uniform 0..4 prior, and the spread of the
+variable's own mean (sigma2 / n) is carried too, since every unanswered
+item shares it. From that:
+
+- p_flip: chance the final pct lands in another zone (normal approx.)
+- next question: the one whose answer most lowers its variable's
+  p_flip (its weight squared drives the variance it removes), scaled by
+  the phase prior when questions carry `phase` (src/question_bank.py)
+- stop: every variable has min_per_variable answers and p_flip below
+  1 - confidence
+
+The readout stays compute_scores on the answered subset.
+"""
+
+from math import erfc, sqrt
+
+from .scoring import ZONES
+
+PRIOR_VARIANCE = 2.0      # variance of a uniform 0..4 answer
+PRIOR_STRENGTH = 2.0      # pseudo-answers the prior is worth
+PHASE_PRIOR = {1: 1.0, 2: 0.8, 3: 0.6}  # earlier phases are asked first
+ZONE_CUTS = (ZONES["YELLOW"][0], ZONES["GREEN"][0])
+
+
+def _below(x):
+    """P(Z < x) for a standard normal."""
+    return 0.5 * erfc(-x / sqrt(2.0))
+
+
+def flip_probability(pct, sd, cuts=ZONE_CUTS):
+    """Chance a N(pct, sd) final score leaves the zone pct is in now."""
+    if sd <= 0:
+        return 0.0
+    lo = max((c for c in cuts if c <= pct), default=None)
+    hi = min((c for c in cuts if c > pct), default=None)
+    p = 0.0
+    if lo is not None:
+        p += _below((lo - pct) / sd)
+    if hi is not None:
+        p += 1.0 - _below((hi - pct) / sd)
+    return min(1.0, p)
+
+
+class AdaptiveSelector:
+    """Chooses among `questions` (the run's sampled list); answers: qid -> 0..4."""
+
+    def __init__(self, questions, confidence=0.95, min_per_variable=2):
+        self.questions = list(questions)
+        self.alpha = 1.0 - confidence
+        self.min_per_variable = min_per_variable
+        self.weights = [float(q.get("weight", 1.0)) for q in self.questions]
+        self.prior = [PHASE_PRIOR.get(q.get("phase"), 1.0) for q in self.questions]
+        self.total_weight = {}
+        for q, w in zip(self.questions, self.weights):
+            self.total_weight[q["variable"]] = self.total_weight.get(q["variable"], 0.0) + w
+
+    def _scored(self, q, a):
+        return (4 - a) if q.get("reverse", False) else a
+
+    @staticmethod
+    def _sd(sigma2, n, rem_w, rem_w2, total):
+        """sd of the final pct: item noise plus the shared uncertainty of the mean."""
+        if not total:
+            return 0.0
+        var = sigma2 * (rem_w2 + rem_w * rem_w / max(n, 1))
+        return 25.0 * sqrt(var) / total
+
+    def variable_state(self, answers):
+        """variable -> {n, remaining, pct, sd, p_flip, stable} plus the terms next_question reuses."""
+        acc = {v: [0, 0.0, 0.0, 0.0, 0.0, 0] for v in self.total_weight}  # n, num, den, sum_s, sum_s2, remaining
+        rem_w = dict.fromkeys(self.total_weight, 0.0)
+        rem_w2 = dict.fromkeys(self.total_weight, 0.0)
+        for q, w in zip(self.questions, self.weights):
+            v = q["variable"]
+            a = answers.get(q["id"])
+            if a is None:
+                acc[v][5] += 1
+                rem_w[v] += w
+                rem_w2[v] += w * w
+                continue
+            s = self._scored(q, int(a))
+            acc[v][0] += 1
+            acc[v][1] += s * w
+            acc[v][2] += w
+            acc[v][3] += s
+            acc[v][4] += s * s
+
+        out = {}
+        for v, (n, num, den, sum_s, sum_s2, remaining) in acc.items():
+            observed = (sum_s2 / n - (sum_s / n) ** 2) if n else 0.0
+            sigma2 = (n * observed + PRIOR_STRENGTH * PRIOR_VARIANCE) / (n + PRIOR_STRENGTH)
+            total = self.total_weight[v]
+            pct = (num / den / 4.0) * 100.0 if den else 50.0
+            # final = (num + sum(w_r * s_r)) / total, s_r ~ (mean, sigma2)
+            sd = self._sd(sigma2, n, rem_w[v], rem_w2[v], total)
+            p_flip = flip_probability(pct, sd) if n else 1.0
+            out[v] = {
+                "n": n,
+                "remaining": remaining,
+                "pct": pct,
+                "sd": sd,
+                "p_flip": p_flip,
+                "stable": remaining == 0 or (n >= self.min_per_variable and p_flip <= self.alpha),
+                "sigma2": sigma2,
+                "total": total,
+                "rem_w": rem_w[v],
+                "rem_w2": rem_w2[v],
+            }
+        return out
+
+    def is_settled(self, answers):
+        return all(info["stable"] for info in self.variable_state(answers).values())
+
+    def next_question(self, answers):
+        """Position in `questions` to ask next, or None once every zone is settled."""
+        state = self.variable_state(answers)
+        if all(info["stable"] for info in state.values()):
+            return None
+
+        best, best_key = None, None
+        for pos, (q, w) in enumerate(zip(self.questions, self.weights)):
+            if q["id"] in answers:
+                continue
+            info = state[q["variable"]]
+            if info["stable"]:
+                continue
+            if info["n"] < self.min_per_variable:
+                # cover thin variables first, fewest answers first
+                gain = 2.0 + (self.min_per_variable - info["n"]) + w / info["total"]
+            else:
+                sd_after = self._sd(
+                    info["sigma2"], info["n"] + 1,
+                    max(0.0, info["rem_w"] - w), max(0.0, info["rem_w2"] - w * w), info["total"],
+                )
+                gain = info["p_flip"] - flip_probability(info["pct"], sd_after)
+            key = (gain * self.prior[pos], -pos)
+            if best_key is None or key > best_key:
+                best, best_key = pos, key
+        return best
+
+    def saved(self, answers):
+        """Sampled questions left unasked."""
+        return sum(1 for q in self.questions if q["id"] not in answers)
@@ -0,0 +1,183 @@
+"""
+Backfill — re-score stored runs under the current scoring config
+    python -m src.engine backfill [--store runs.sqlite3] [--chunk-size 20000]
+
+Every run carries the config_version that scored it (scoreconfig.py).
+For each lens, the backfill looks at the versions its runs were scored
+under and diffs each against the current config:
+
+- no change for this lens: the runs are relabelled in one UPDATE
+- otherwise they are re-scored with BatchScorer in id-ordered chunks,
+  each run summed in the order its answers were stored (run order, as
+  finish_run scored it), and only what moved is rewritten: the changed
+  variables' rows (all of a run's rows when the zone cuts moved), and
+  the overall score, zone and lever when the overall moved
+
+Runs stored before versioning (NULL) or under a version this store
+never registered are re-scored in full. Each chunk's updates and its
+checkpoint (backfill_progress: last id per target version and lens)
+commit together, so an interrupted job resumes where it stopped; a
+rerun after completion starts over but only finds runs that older
+processes stored since. Rollups and norm sketches are refolded once at
+the end, when anything was re-scored (or a refold was interrupted).
+User trends keep the scores users were shown.
+"""
+
+import json
+import time
+
+import numpy as np
+
+from . import norms, rollups, scoreconfig
+from .bank import BANKS
+from .batch import ZONE_NAMES, BatchScorer
+from .store import DEFAULT_PATH, SCHEMA as STORE_SCHEMA, connect, migrate
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_progress (
+    target TEXT NOT NULL,
+    lens TEXT NOT NULL,
+    last_id INTEGER NOT NULL,
+    rescored INTEGER NOT NULL,
+    done INTEGER NOT NULL,
+    PRIMARY KEY (target, lens)
+) WITHOUT ROWID;
+"""
+REFOLD = "(refold)"  # progress row for the final rollup/norm rebuild (done = 0: still owed)
+UNCHANGED = scoreconfig.LensChange(frozenset(), False, False)
+
+
+def _progress(conn, target, lens):
+    row = conn.execute(
+        "SELECT last_id, rescored, done FROM backfill_progress WHERE target = ? AND lens = ?", (target, lens)
+    ).fetchone()
+    return tuple(row) if row is not None else (0, 0, 1)
+
+def _checkpoint(conn, target, lens, last_id, rescored, done=0):
+    conn.execute(
+        "INSERT INTO backfill_progress (target, lens, last_id, rescored, done) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (target, lens) DO UPDATE SET last_id = excluded.last_id, "
+        "rescored = excluded.rescored, done = excluded.done",
+        (target, lens, last_id, rescored, done),
+    )
+
+
+def change_for(conn, lens, source, target):
+    """LensChange from `source` to target for one lens; None when its scores do not move."""
+    old = scoreconfig.load_config(conn, source)
+    if old is None:  # scored before versioning, or under a config this store never saw
+        return scoreconfig.LensChange(frozenset(BANKS[lens].variables), True, True)
+    return old.diff(target).get(lens)
+
+def plan(conn, lens, target):
+    """source version -> change_for() for every version runs of `lens` were scored under, other than target."""
+    return {
+        source: change_for(conn, lens, source, target)
+        for (source,) in conn.execute(
+            "SELECT DISTINCT config_version FROM runs WHERE lens = ? AND config_version IS NOT ?",
+            (lens, target.version),
+        ).fetchall()
+    }
+
+
+def _rescore_chunk(conn, scorer, target, rows, changes):
+    """Re-score rows (id, answers JSON, source version) and write back what their change touches."""
+    ids = np.array([r[0] for r in rows])
+    runs = [json.loads(r[1]) for r in rows]
+    matrix = scorer.answer_matrix(runs)
+    ranks = scorer.rank_matrix(runs)  # stored key order is the order the run was scored in
+    scores = scorer.score(matrix, ranks)
+    best = scorer.levers(matrix, scores, ranks).ranked[:, 0]
+    change = [changes[r[2]] for r in rows]
+
+    # variables: one executemany row per (run, changed variable) present in the run
+    var_rows = []
+    for vi, v in enumerate(scorer.variables):
+        touched = np.array([c.zones or v in c.variables for c in change]) & scores.present[:, vi]
+        var_rows += zip(
+            scores.pct[touched, vi].tolist(),
+            [ZONE_NAMES[z] for z in scores.zone[touched, vi].tolist()],
+            scores.volatility[touched, vi].tolist(),
+            ids[touched].tolist(),
+            [v] * int(touched.sum()),
+        )
+    conn.executemany(
+        "UPDATE run_variables SET pct = ?, zone = ?, volatility = ? WHERE run_id = ? AND variable = ?", var_rows
+    )
+
+    # runs: the overall, its zone and the lever move together
+    zones = np.digitize(scores.overall, scorer.zone_cuts)
+    moved = np.array([c.overall or c.zones for c in change])
+    conn.executemany(
+        "UPDATE runs SET overall = ?, zone = ?, lever = ?, config_version = ? WHERE id = ?",
+        [
+            (float(scores.overall[i]), ZONE_NAMES[zones[i]], scorer.ids[best[i]] if best[i] >= 0 else None,
+             target.version, int(ids[i]))
+            for i in np.flatnonzero(moved).tolist()
+        ],
+    )
+    conn.executemany(
+        "UPDATE runs SET config_version = ? WHERE id = ?",
+        [(target.version, int(ids[i])) for i in np.flatnonzero(~moved).tolist()],
+    )
+
+
+def backfill(path=DEFAULT_PATH, chunk_size=20000, log=None):
+    """Bring every run in the store at `path` to the current config; lens -> runs re-scored."""
+    log = log or (lambda msg: None)
+    target = scoreconfig.current_config()
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executescript(STORE_SCHEMA + SCHEMA)
+            migrate(conn)
+            scoreconfig.register(conn, target, time.time())
+
+        stats = {}
+        for lens, bank in BANKS.items():
+            last_id, rescored, done = _progress(conn, target.version, lens)
+            if done:  # a new job (the config may have come back to target since)
+                last_id, rescored = 0, 0
+            changes = plan(conn, lens, target)
+            with conn:
+                for source, change in changes.items():
+                    if change is None:
+                        conn.execute(
+                            "UPDATE runs SET config_version = ? WHERE lens = ? AND config_version IS ?",
+                            (target.version, lens, source),
+                        )
+                        log(f"{lens}: relabelled runs scored under {source} (no change for this lens)")
+            changes = {s: c for s, c in changes.items() if c is not None}
+            if changes:
+                scorer = BatchScorer.from_bank(bank, variable_weights=target.variable_weights, zone_cuts=target.zone_cuts)
+                started = time.monotonic()
+                while True:
+                    rows = conn.execute(
+                        "SELECT id, answers, config_version FROM runs "
+                        "WHERE lens = ? AND id > ? AND config_version IS NOT ? ORDER BY id LIMIT ?",
+                        (lens, last_id, target.version, chunk_size),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    # recorded mid-backfill by a process still on an older config
+                    for source in {r[2] for r in rows} - changes.keys():
+                        changes[source] = change_for(conn, lens, source, target) or UNCHANGED
+                    with conn:
+                        _rescore_chunk(conn, scorer, target, rows, changes)
+                        last_id, rescored = rows[-1][0], rescored + len(rows)
+                        _checkpoint(conn, target.version, lens, last_id, rescored)
+                        _checkpoint(conn, target.version, REFOLD, 0, 0)
+                    log(f"{lens}: {rescored} runs re-scored ({rescored / (time.monotonic() - started):,.0f}/s)")
+            with conn:
+                _checkpoint(conn, target.version, lens, last_id, rescored, done=1)
+            stats[lens] = rescored
+
+        if not _progress(conn, target.version, REFOLD)[2]:
+            log("refolding rollups and norm sketches")
+            with conn:
+                rollups.rebuild_rollups(conn)
+                norms.rebuild_norms(conn)
+                _checkpoint(conn, target.version, REFOLD, 0, sum(stats.values()), done=1)
+        return stats
+    finally:
+        conn.close()
@@ -0,0 +1,106 @@
+"""
+Lens Question Banks — compiled
+The banks are authored as JSON in src/banks/ (see bankfile.py). At
+import each lens is loaded once into a frozen struct-of-arrays
+(CompiledLens) that the UI, scoring and sampling code all share, so
+reruns never copy or rescan the dicts. QUESTION_BANK keeps the plain
+lens -> list of question dicts view.
+
+Each question: id, text, variable, weight, reverse
+reverse=True means higher answer is worse, so we flip: score = 4 - answer
+"""
+
+import hashlib
+import json
+import sys
+from array import array
+from dataclasses import dataclass
+from types import MappingProxyType
+
+# --------------------------
+# Compiled form
+# --------------------------
+@dataclass(frozen=True)
+class CompiledLens:
+    """
+    One lens as parallel arrays indexed by bank position.
+    variables is the interned code table; var_codes[pos] indexes it.
+    reverse[pos] is 1 when that question is reverse-scored, else 0.
+    version is a short content hash of the questions, so anything stored
+    against a bank can tell which edition of it was asked.
+    """
+    lens: str
+    version: str
+    questions: tuple
+    ids: tuple
+    texts: tuple
+    variables: tuple
+    var_codes: array
+    weights: array
+    reverse: bytes
+    index: MappingProxyType
+    by_variable: MappingProxyType
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, qid: str) -> int:
+        return self.index[qid]
+
+    def variable(self, pos: int) -> str:
+        return self.variables[self.var_codes[pos]]
+
+    def weight(self, pos: int) -> float:
+        return self.weights[pos]
+
+    def is_reverse(self, pos: int) -> bool:
+        return self.reverse[pos] == 1
+
+    def question(self, pos: int) -> dict:
+        return self.questions[pos]
+
+
+def bank_version(questions) -> str:
+    blob = json.dumps(list(questions), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+def compile_lens(lens: str, questions) -> CompiledLens:
+    questions = tuple(questions)
+    ids = tuple(sys.intern(q["id"]) for q in questions)
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{lens}: duplicate question ids")
+
+    variables = tuple(dict.fromkeys(sys.intern(q["variable"]) for q in questions))
+    code_of = {v: i for i, v in enumerate(variables)}
+    if len(variables) > 255:
+        raise ValueError(f"{lens}: too many variables ({len(variables)})")
+
+    by_variable = {v: [] for v in variables}
+    for pos, q in enumerate(questions):
+        by_variable[q["variable"]].append(pos)
+
+    return CompiledLens(
+        lens=lens,
+        version=bank_version(questions),
+        questions=questions,
+        ids=ids,
+        texts=tuple(q["text"] for q in questions),
+        variables=variables,
+        var_codes=array("B", (code_of[q["variable"]] for q in questions)),
+        weights=array("d", (float(q.get("weight", 1.0)) for q in questions)),
+        reverse=bytes(1 if q.get("reverse", False) else 0 for q in questions),
+        index=MappingProxyType({qid: pos for pos, qid in enumerate(ids)}),
+        by_variable=MappingProxyType({v: tuple(p) for v, p in by_variable.items()}),
+    )
+
+
+def compile_banks(bank: dict) -> dict:
+    return MappingProxyType({lens: compile_lens(lens, qs) for lens, qs in bank.items()})
+
+
+from .bankfile import load_lenses  # noqa: E402 - bankfile builds CompiledLens from this module
+
+BANKS = load_lenses()
+LENSES = tuple(BANKS)
+QUESTION_BANK = MappingProxyType({lens: list(bank.questions) for lens, bank in BANKS.items()})
@@ -0,0 +1,237 @@
+"""
+Bank files — question banks as data, compiled once per content hash
+Each lens is a JSON file in src/banks/ ({"lens", "questions": [...]});
+index.json lists the lens files in display order plus the universal
+bank. load_lens() checks the compiled cache first: the artifact is
+keyed by the file's content hash (and the format/marshal version), so
+startup only hashes the bytes and unmarshals arrays. Parsing, schema
+validation and compilation happen only for a file that changed.
+
+    python -m src.bankfile compile   # validate + (re)build every artifact
+    python -m src.bankfile check     # validate only
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import sys
+from array import array
+from types import MappingProxyType
+
+BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "banks")
+CACHE_DIR = os.environ.get("WEATHER_BANK_CACHE", os.path.join(BANK_DIR, "__bankcache__"))
+FORMAT = 2  # artifact layout; bump when _to_artifact changes
+
+QUESTION_FIELDS = {
+    # field: (required, accepted types)
+    "id": (True, (str,)),
+    "text": (True, (str,)),
+    "variable": (True, (str,)),
+    "weight": (False, (int, float)),
+    "reverse": (False, (bool,)),
+    "phase": (False, (int,)),
+}
+
+
+class BankFormatError(ValueError):
+    """A bank file that does not match the schema; lists every problem found."""
+
+    def __init__(self, source, problems):
+        self.source = source
+        self.problems = problems
+        super().__init__(f"{source}: " + "; ".join(problems))
+
+
+# --------------------------
+# Schema
+# --------------------------
+def validate(data, source="<bank>"):
+    """Raise BankFormatError unless `data` is a well-formed bank document."""
+    problems = []
+    if not isinstance(data, dict):
+        raise BankFormatError(source, ["top level must be an object"])
+    if not isinstance(data.get("lens"), str) or not data["lens"].strip():
+        problems.append("lens: expected a non-empty string")
+    questions = data.get("questions")
+    if not isinstance(questions, list) or not questions:
+        problems.append("questions: expected a non-empty list")
+        questions = []
+    for key in data:
+        if key not in ("lens", "description", "questions"):
+            problems.append(f"{key}: unknown top-level field")
+
+    seen = set()
+    for i, q in enumerate(questions):
+        where = f"questions[{i}]"
+        if not isinstance(q, dict):
+            problems.append(f"{where}: expected an object")
+            continue
+        for field, (required, types) in QUESTION_FIELDS.items():
+            if field not in q:
+                if required:
+                    problems.append(f"{where}.{field}: missing")
+                continue
+            value = q[field]
+            # bool is an int subclass; only `reverse` may be one
+            if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+                problems.append(f"{where}.{field}: expected {'/'.join(t.__name__ for t in types)}")
+        for field in q:
+            if field not in QUESTION_FIELDS:
+                problems.append(f"{where}.{field}: unknown field")
+        if isinstance(q.get("id"), str):
+            if not q["id"]:
+                problems.append(f"{where}.id: empty")
+            elif q["id"] in seen:
+                problems.append(f"{where}.id: duplicate {q['id']!r}")
+            seen.add(q["id"])
+        w = q.get("weight", 1.0)
+        if isinstance(w, (int, float)) and not isinstance(w, bool) and not w > 0:
+            problems.append(f"{where}.weight: must be > 0")
+
+    if problems:
+        raise BankFormatError(source, problems)
+    return data
+
+
+# --------------------------
+# Compiled artifact
+# --------------------------
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:20]
+
+def artifact_path(path, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{digest}-f{FORMAT}m{marshal.version}.bin")
+
+def _to_artifact(lens):
+    return {
+        "lens": lens.lens,
+        "version": lens.version,
+        "questions": lens.questions,
+        "ids": lens.ids,
+        "texts": lens.texts,
+        "variables": lens.variables,
+        "var_codes": lens.var_codes.tobytes(),
+        "weights": lens.weights.tobytes(),
+        "reverse": lens.reverse,
+        "by_variable": tuple(lens.by_variable.values()),
+    }
+
+def _from_artifact(blob):
+    from .bank import CompiledLens
+
+    ids = tuple(sys.intern(qid) for qid in blob["ids"])
+    variables = tuple(sys.intern(v) for v in blob["variables"])
+    var_codes = array("B")
+    var_codes.frombytes(blob["var_codes"])
+    weights = array("d")
+    weights.frombytes(blob["weights"])
+    return CompiledLens(
+        lens=blob["lens"],
+        version=blob["version"],
+        questions=blob["questions"],
+        ids=ids,
+        texts=blob["texts"],
+        variables=variables,
+        var_codes=var_codes,
+        weights=weights,
+        reverse=blob["reverse"],
+        index=MappingProxyType({qid: pos for pos, qid in enumerate(ids)}),
+        by_variable=MappingProxyType(dict(zip(variables, blob["by_variable"]))),
+    )
+
+def _write_artifact(target, lens):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(marshal.dumps(_to_artifact(lens)))
+    os.replace(tmp, target)
+
+
+# --------------------------
+# Load
+# --------------------------
+def compile_file(path, raw=None):
+    """Parse, validate and compile one bank file (no cache involved)."""
+    from .bank import compile_lens
+
+    if raw is None:
+        with open(path, "rb") as f:
+            raw = f.read()
+    source = os.path.basename(path)
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        raise BankFormatError(source, [f"invalid JSON: {e}"]) from None
+    validate(data, source)
+    return compile_lens(data["lens"], data["questions"])
+
+def load_lens(path, use_cache=True):
+    """CompiledLens for one bank file, from the compiled cache when it is current."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    target = artifact_path(path, content_hash(raw))
+    if use_cache:
+        try:
+            with open(target, "rb") as f:
+                return _from_artifact(marshal.loads(f.read()))
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            pass
+    lens = compile_file(path, raw)
+    if use_cache:
+        try:
+            _write_artifact(target, lens)
+        except OSError:
+            pass  # read-only install: still usable, just not cached
+    return lens
+
+def _index(bank_dir):
+    with open(os.path.join(bank_dir, "index.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def load_lenses(bank_dir=BANK_DIR, use_cache=True):
+    """lens name -> CompiledLens, in index.json order."""
+    banks = {}
+    for name in _index(bank_dir)["lenses"]:
+        lens = load_lens(os.path.join(bank_dir, name), use_cache)
+        if lens.lens in banks:
+            raise BankFormatError(name, [f"lens {lens.lens!r} is defined twice"])
+        banks[lens.lens] = lens
+    return MappingProxyType(banks)
+
+def load_universal(bank_dir=BANK_DIR, use_cache=True):
+    return load_lens(os.path.join(bank_dir, _index(bank_dir)["universal"]), use_cache)
+
+def bank_files(bank_dir=BANK_DIR):
+    index = _index(bank_dir)
+    return [os.path.join(bank_dir, name) for name in (*index["lenses"], index["universal"])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.bankfile")
+    parser.add_argument("command", choices=("compile", "check"))
+    parser.add_argument("--dir", default=BANK_DIR, help="bank directory (default src/banks)")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in bank_files(args.dir):
+        try:
+            if args.command == "check":
+                lens = compile_file(path)
+            else:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                lens = compile_file(path, raw)
+                _write_artifact(artifact_path(path, content_hash(raw)), lens)
+        except BankFormatError as e:
+            failed += 1
+            print(e, file=sys.stderr)
+            continue
+        print(f"{os.path.basename(path)}: {lens.lens}, {len(lens)} questions, version {lens.version}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Batch scoring — many respondents at once
+Scores an (N respondents x questions) answer matrix for one lens with
+the same math as scoring.compute_scores, vectorized over respondents.
+compute_scores sums in the order its question list is given, so a batch
+sums each row in that row's question order (rank_matrix; bank order
+when none is given) and pstdev is exact either way — results match the
+single-run scorer bit for bit, and nightly re-scores agree with what
+the UI showed.
+"""
+
+from dataclasses import dataclass
+from statistics import pstdev
+
+import numpy as np
+
+from .scoring import VARIABLE_WEIGHTS, ZONES, clamp
+from .sensitivity import lever_scores
+
+UNANSWERED = -1  # answer-matrix sentinel for a question that was skipped
+ZONE_NAMES = ("RED", "YELLOW", "GREEN")  # zone codes index into this
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    """
+    Arrays are indexed [respondent] or [respondent, variable]; variables
+    follow `variables`. Variables a respondent did not answer have
+    present=False, pct/mean/volatility NaN and zone -1.
+    ranked holds question columns, lowest signal first; unanswered
+    columns are -1 at the tail. first_seen is the rank (the column, in
+    bank order) at which each variable was first answered, past every
+    rank if never: the order compute_scores walks variables in.
+    """
+    variables: tuple
+    overall: np.ndarray
+    mean_0_4: np.ndarray
+    pct: np.ndarray
+    zone: np.ndarray
+    volatility: np.ndarray
+    present: np.ndarray
+    ranked: np.ndarray
+    n_answered: np.ndarray
+    first_seen: np.ndarray
+
+    def row(self, i):
+        """Respondent i as compute_scores' (overall, per_variable) shape."""
+        per_variable = {}
+        order = np.argsort(self.first_seen[i], kind="stable")
+        for vi in order:
+            if not self.present[i, vi]:
+                continue
+            per_variable[self.variables[vi]] = {
+                "mean_0_4": float(self.mean_0_4[i, vi]),
+                "pct": float(self.pct[i, vi]),
+                "zone": ZONE_NAMES[self.zone[i, vi]],
+                "volatility": float(self.volatility[i, vi]),
+            }
+        return float(self.overall[i]), per_variable
+
+
+class BatchScorer:
+    """
+    Precomputes weight vector, reverse mask and variable membership for
+    one lens's question list; score() then takes any number of runs.
+    Column j of the answer matrix is questions[j].
+    """
+
+    def __init__(self, questions, variable_weights=None, zone_cuts=None):
+        variable_weights = VARIABLE_WEIGHTS if variable_weights is None else variable_weights
+        self.questions = list(questions)
+        self.ids = tuple(q["id"] for q in self.questions)
+        self.index = {qid: j for j, qid in enumerate(self.ids)}
+
+        # VARIABLE_WEIGHTS order first, then anything else the bank uses
+        seen = [q["variable"] for q in self.questions]
+        self.variables = tuple(
+            [v for v in variable_weights if v in seen]
+            + [v for v in dict.fromkeys(seen) if v not in variable_weights]
+        )
+        var_pos = {v: i for i, v in enumerate(self.variables)}
+
+        self.weights = np.array([float(q.get("weight", 1.0)) for q in self.questions], dtype=np.float64)
+        self.reverse = np.array([bool(q.get("reverse", False)) for q in self.questions], dtype=bool)
+        self.var_of = np.array([var_pos[q["variable"]] for q in self.questions], dtype=np.intp)
+        self.membership = np.zeros((len(self.questions), len(self.variables)), dtype=np.int64)
+        self.membership[np.arange(len(self.questions)), self.var_of] = 1
+        self.var_cols = tuple(np.flatnonzero(self.var_of == vi) for vi in range(len(self.variables)))
+        self.var_weights = np.array(
+            [float(variable_weights.get(v, 1.0)) for v in self.variables], dtype=np.float64
+        )
+        if zone_cuts is None:
+            zone_cuts = (ZONES["YELLOW"][0], ZONES["GREEN"][0])
+        self.zone_cuts = np.asarray(zone_cuts, dtype=np.float64)
+
+        # pstdev only depends on (count, count*sumsq - sum^2); memo it
+        self._vol_cache = {}
+
+    @classmethod
+    def from_bank(cls, bank, positions=None, variable_weights=None, zone_cuts=None):
+        """Columns are bank positions of a CompiledLens (all of them by default)."""
+        positions = range(len(bank)) if positions is None else positions
+        return cls([bank.question(p) for p in positions], variable_weights, zone_cuts)
+
+    def answer_matrix(self, runs):
+        """Answer dicts (qid -> 0..4) to an int8 matrix, UNANSWERED elsewhere."""
+        runs = list(runs)
+        out = np.full((len(runs), len(self.ids)), UNANSWERED, dtype=np.int8)
+        for i, answers in enumerate(runs):
+            for qid, a in answers.items():
+                j = self.index.get(qid)
+                if j is not None:
+                    out[i, j] = int(a)
+        return out
+
+    def rank_matrix(self, orders):
+        """
+        Question orders (qid iterables, one per run) to the (N, Q) ranks
+        score() and levers() sum in; columns a run does not list follow
+        the listed ones in bank order.
+        """
+        orders = list(orders)
+        n_q = len(self.ids)
+        out = np.tile(np.arange(n_q, 2 * n_q, dtype=np.intp), (len(orders), 1))
+        for i, order in enumerate(orders):
+            cols = [j for j in map(self.index.get, dict.fromkeys(order)) if j is not None]
+            out[i, cols] = np.arange(len(cols))
+        return out
+
+    def _ranks(self, ranks, shape):
+        if ranks is None:
+            return np.broadcast_to(np.arange(shape[1], dtype=np.intp), shape)
+        ranks = np.atleast_2d(np.asarray(ranks))
+        if ranks.shape != shape:
+            raise ValueError(f"rank matrix has shape {ranks.shape}, answers have {shape}")
+        return ranks
+
+    def score(self, answers, ranks=None):
+        """
+        answers: (N, Q) ints 0..4, negative = unanswered. ranks: the
+        rank_matrix of the question order each run was scored in; bank
+        order when None.
+        """
+        A = np.asarray(answers)
+        if A.ndim == 1:
+            A = A[None, :]
+        n_rows, n_q = A.shape
+        if n_q != len(self.ids):
+            raise ValueError(f"answer matrix has {n_q} columns, lens has {len(self.ids)} questions")
+        R = self._ranks(ranks, A.shape)
+        answered = A >= 0
+        if np.any(A[answered] > 4):
+            raise ValueError("answers must be in 0..4")
+
+        a = np.where(answered, A, 0).astype(np.int64)
+        s = np.where(self.reverse, 4 - a, a)  # 0..4 higher is better
+        s = np.where(answered, s, 0)
+
+        # exact integer stats through the membership matrix
+        count = answered.astype(np.int64) @ self.membership
+        total = s @ self.membership
+        sumsq = (s * s) @ self.membership
+        present = count > 0
+
+        n_vars = len(self.variables)
+        num = np.zeros((n_rows, n_vars))
+        den = np.zeros((n_rows, n_vars))
+        never = 2 * n_q  # past every rank
+        first_seen = np.full((n_rows, n_vars), never, dtype=np.intp)
+        for vi, cols in enumerate(self.var_cols):
+            if not len(cols):
+                continue
+            # cumsum adds left to right in each row's rank order, the
+            # order compute_scores uses
+            mask = answered[:, cols]
+            terms = np.where(mask, s[:, cols] * self.weights[cols], 0.0)
+            wts = np.where(mask, self.weights[cols], 0.0)
+            rank = R[:, cols]
+            if ranks is not None:
+                perm = np.argsort(rank, axis=1, kind="stable")
+                terms = np.take_along_axis(terms, perm, axis=1)
+                wts = np.take_along_axis(wts, perm, axis=1)
+            num[:, vi] = np.cumsum(terms, axis=1)[:, -1]
+            den[:, vi] = np.cumsum(wts, axis=1)[:, -1]
+            first_seen[:, vi] = np.where(mask, rank, never).min(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_0_4 = num / np.where(den != 0, den, 1.0)
+        mean_0_4 = np.where(present, mean_0_4, np.nan)
+        pct = (mean_0_4 / 4.0) * 100.0
+        zone = np.where(present, np.digitize(np.nan_to_num(pct), self.zone_cuts), -1).astype(np.int8)
+        volatility = np.where(present, self._volatility(s, answered, count, total, sumsq), np.nan)
+
+        # overall: VARIABLE_WEIGHTS-weighted mean, summed in the order each
+        # variable first appeared in the question list (dict order upstream)
+        rows = np.arange(n_rows)
+        var_order = np.argsort(first_seen, axis=1, kind="stable")
+        o_num = np.zeros(n_rows)
+        o_den = np.zeros(n_rows)
+        for k in range(n_vars):
+            vi = var_order[:, k]
+            here = present[rows, vi]
+            o_num = o_num + np.where(here, np.nan_to_num(pct[rows, vi]) * self.var_weights[vi], 0.0)
+            o_den = o_den + np.where(here, self.var_weights[vi], 0.0)
+        overall = np.where(o_den != 0, o_num / np.where(o_den != 0, o_den, 1.0), 0.0)
+
+        # dominant distortions: low score first, heavier weight first, then question order
+        order = np.lexsort((R, np.broadcast_to(-self.weights, (n_rows, n_q)), np.where(answered, s, 5)), axis=-1)
+        ranked = np.where(np.take_along_axis(answered, order, axis=1), order, -1)
+
+        return BatchScores(
+            variables=self.variables,
+            overall=overall,
+            mean_0_4=mean_0_4,
+            pct=pct,
+            zone=zone,
+            volatility=volatility,
+            present=present,
+            ranked=ranked,
+            n_answered=answered.sum(axis=1),
+            first_seen=first_seen,
+        )
+
+    def levers(self, answers, scores=None, ranks=None):
+        """
+        sensitivity.LeverScores for the same (N, Q) answer matrix and
+        ranks score() takes; pass score()'s result as `scores` to reuse
+        its pcts.
+        """
+        A = np.atleast_2d(np.asarray(answers))
+        answered = A >= 0
+        a = np.where(answered, A, 0)
+        s = np.where(self.reverse, 4 - a, a)
+        pct = scores.pct if scores is not None else None
+        return lever_scores(
+            s, answered, self.weights, self.var_of, self.var_weights, pct, self.zone_cuts, ranks
+        )
+
+    def _volatility(self, s, answered, count, total, sumsq):
+        """stdev of the 0..4 scores scaled to 0..100, bit-identical to pstdev."""
+        spread = count * sumsq - total * total  # n^2 * variance, exact
+        vol = np.zeros(count.shape)
+        for vi, cols in enumerate(self.var_cols):
+            keys = np.stack([count[:, vi], spread[:, vi]], axis=1)
+            uniq, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+            values = np.zeros(len(uniq))
+            for u, (key, i) in enumerate(zip(map(tuple, uniq.tolist()), first.tolist())):
+                if key[0] < 2:
+                    continue
+                v = self._vol_cache.get(key)
+                if v is None:
+                    # any run with the same key gives the same pstdev
+                    raw = s[i, cols][answered[i, cols]].tolist()
+                    v = clamp((pstdev(raw) / 2.0) * 100.0, 0, 100)
+                    self._vol_cache[key] = v
+                values[u] = v
+            vol[:, vi] = values[inverse.reshape(-1)]
+        return vol
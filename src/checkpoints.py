@@ -0,0 +1,160 @@
+"""
+Checkpoints — in-progress runs that survive reloads and restarts
+One row per resume id: the run's token (runtoken.py), which already
+carries the lens, bank version, question order, answers, position and
+adaptive flag. save() only swaps the id's entry in a pending dict; a
+background writer wakes every flush_interval seconds and upserts
+whatever is pending, so a burst of clicks costs one row write and no
+click waits on disk. A crash loses at most the last flush_interval.
+
+The table lives in the run store's database file (WAL), so any process
+pointed at the same WEATHER_RUN_STORE can load() a checkpoint another
+process wrote: several Streamlit workers behind a load balancer need no
+sticky sessions. load() checks this process's pending writes first.
+Rows older than max_age are pruned by the writer.
+"""
+
+import atexit
+import secrets
+import sys
+import threading
+import time
+
+from . import metrics
+from .store import DEFAULT_PATH, connect, write_with_retry
+
+MAX_AGE = 7 * 24 * 3600  # seconds an untouched checkpoint is kept
+PRUNE_EVERY = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    token TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checkpoints_ts ON checkpoints(ts);
+"""
+
+_DROP = None  # pending value for a deleted checkpoint
+
+
+class Checkpoints:
+    def __init__(self, path=DEFAULT_PATH, flush_interval=0.5, max_age=MAX_AGE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_age = max_age
+
+        conn = connect(path)
+        with conn:
+            conn.executescript(SCHEMA)
+        conn.close()
+
+        self._pending = {}   # id -> (ts, token) or _DROP, latest wins
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._inflight = {}  # the batch being written, still visible to load()
+        self._stop = False
+        self._local = threading.local()
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def new_id():
+        """A fresh resume id: 16 URL-safe characters, unguessable."""
+        return secrets.token_urlsafe(12)
+
+    # --------------------------
+    # Write (non-blocking)
+    # --------------------------
+    def save(self, resume_id, token):
+        with self._lock:
+            self._pending[resume_id] = (time.time(), token)
+        self._wake.set()
+
+    def drop(self, resume_id):
+        with self._lock:
+            self._pending[resume_id] = _DROP
+        self._wake.set()
+
+    def flush(self):
+        """Block until everything saved so far is on disk."""
+        self._wake.set()
+        with self._idle:
+            while self._pending or self._inflight:
+                self._idle.wait()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._stop = True
+            self._wake.set()
+            self._writer.join()
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        pruned = 0.0
+        try:
+            while True:
+                self._wake.wait()
+                if not self._stop:
+                    time.sleep(self.flush_interval)  # let a burst of clicks coalesce
+                with self._lock:
+                    self._wake.clear()
+                    batch = self._inflight = self._pending
+                    self._pending = {}
+                prune = time.monotonic() - pruned > PRUNE_EVERY
+                try:
+                    error = write_with_retry(conn, lambda c: self._write_batch(c, batch, prune and self.max_age))
+                    if error is None and prune:
+                        pruned = time.monotonic()
+                    elif error is not None:  # best effort: the run's next save writes it again
+                        metrics.count("checkpoints.dropped", len(batch))
+                        print(f"checkpoints: dropped {len(batch)} writes: {error}", file=sys.stderr)
+                finally:
+                    with self._lock:
+                        self._inflight = {}
+                        self._idle.notify_all()
+                if self._stop:
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write_batch(conn, batch, max_age=None):
+        """Upsert and delete one batch; with max_age, also prune rows older than that."""
+        conn.executemany(
+            "INSERT INTO checkpoints (id, ts, token) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET ts = excluded.ts, token = excluded.token",
+            [(rid, *entry) for rid, entry in batch.items() if entry is not _DROP],
+        )
+        conn.executemany(
+            "DELETE FROM checkpoints WHERE id = ?",
+            [(rid,) for rid, entry in batch.items() if entry is _DROP],
+        )
+        if max_age:
+            conn.execute("DELETE FROM checkpoints WHERE ts < ?", (time.time() - max_age,))
+
+    # --------------------------
+    # Query
+    # --------------------------
+    def reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def load(self, resume_id):
+        """The latest token saved under resume_id by any process, or None."""
+        with self._lock:
+            for pending in (self._pending, self._inflight):
+                if resume_id in pending:
+                    entry = pending[resume_id]
+                    return None if entry is _DROP else entry[1]
+        row = self.reader().execute(
+            "SELECT token FROM checkpoints WHERE id = ? AND ts >= ?", (resume_id, time.time() - self.max_age)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def count(self):
+        return self.reader().execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
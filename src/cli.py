@@ -0,0 +1,223 @@
+"""
+Headless scoring — python -m src.engine score runs.jsonl
+Streams JSONL or CSV records ({"lens", "answers"}) through a generator
+pipeline and writes one JSON line per run: the results page's Export
+block plus zones, lever (sensitivity.py) and next focus targets. Memory stays
+flat; --workers N scores fixed-size chunks in a process pool with a
+bounded number of chunks in flight.
+
+CSV input needs a `lens` column and either an `answers` column holding
+a JSON object, or one column per question id. An optional `q_order`
+(JSON list of ids) reproduces the on-screen question order exactly.
+A record may instead be just {"token": ...} (or a `token` column): the
+run token from the results page, which carries lens, order and answers.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .bank import BANKS
+from .scoring import (
+    compute_scores,
+    export_record,
+    next_focus_targets,
+    weakest_and_strongest,
+    weakest_lever,
+)
+
+# --------------------------
+# Read
+# --------------------------
+def read_items(stream, fmt):
+    """Raw items: JSONL lines stay strings (parsed in the worker), CSV rows are dicts."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield line
+
+def parse_item(item, fmt):
+    if fmt != "csv":
+        return json.loads(item)
+    if item.get("token"):
+        return {"token": item["token"]}
+    lens = item.pop("lens", None)
+    q_order = item.pop("q_order", None)
+    if item.get("answers"):
+        answers = json.loads(item["answers"])
+    else:
+        answers = {}
+        for qid, v in item.items():
+            if v in (None, ""):
+                continue
+            try:
+                answers[qid] = int(v)
+            except ValueError:
+                raise ValueError(f"{qid}: answer {v!r} is not an integer 0..4") from None
+    record = {"lens": lens, "answers": answers}
+    if q_order:
+        record["q_order"] = json.loads(q_order)
+    return record
+
+# --------------------------
+# Score
+# --------------------------
+def checked_run(record):
+    """(bank, answers) for a {"lens", "answers"} or {"token"} record; ValueError if it does not fit the bank."""
+    if record.get("token"):
+        from .runtoken import decode_run
+
+        run, _ = decode_run(record["token"])
+        return run.bank, run.answer_dict()  # in run order
+    lens = record.get("lens")
+    bank = BANKS.get(lens)
+    if bank is None:
+        raise ValueError(f"unknown lens {lens!r}")
+    try:
+        answers = dict((record.get("answers") or {}).items())
+    except AttributeError:
+        raise ValueError(f"{lens}: answers must be an object of question id -> 0..4") from None
+    for qid, a in answers.items():
+        if qid not in bank.index:
+            raise ValueError(f"{lens}: unknown question id {qid!r}")
+        if type(a) is not int or not 0 <= a <= 4:  # bool is an int subclass; 3.0 and "3" are not answers
+            raise ValueError(f"{qid}: answer {a!r} is not an integer 0..4")
+    return bank, answers
+
+_RANK = object()  # readout_record's default: rank the lever here
+
+def readout_record(lens, answers, overall, per_variable, scored_qs_sorted, lever=_RANK, order=None):
+    """
+    Export block plus zones, lever and next focus targets. lever: the
+    qid (or None) when a batch pass already ranked it (BatchScorer.levers).
+    order: the qids in the order compute_scores scored them (default: answers').
+    """
+    out = export_record(lens, overall, per_variable, answers)
+    out["zones"] = {v: per_variable[v]["zone"] for v in per_variable}
+    lowest, _ = weakest_and_strongest(per_variable)
+    if lever is _RANK:
+        try:
+            from .sensitivity import rank_levers
+        except ImportError:  # without NumPy: lowest score, heaviest weight in the weakest variable
+            best = weakest_lever(per_variable, scored_qs_sorted)
+        else:
+            ranked = rank_levers(scored_qs_sorted, per_variable, order=answers if order is None else order)
+            best = ranked[0][0] if ranked else None
+        lever = best[3]["id"] if best else None
+    out["lever"] = lever
+    out["next_targets"] = next_focus_targets(per_variable, lowest) if lowest else []
+    return out
+
+def run_order(record, bank, answers):
+    """
+    The qids in the order the run's questions were scored: a token's run
+    order, else q_order, else bank order. Answered ids q_order leaves
+    out follow in bank order, so every answer is scored.
+    """
+    if record.get("token"):
+        return list(answers)
+    order = [str(qid) for qid in record.get("q_order") or ()]
+    for qid in order:
+        if qid not in bank.index:
+            raise ValueError(f"{bank.lens}: unknown question id {qid!r} in q_order")
+    listed = set(order)
+    return order + [qid for qid in bank.ids if qid in answers and qid not in listed]
+
+def score_record(record):
+    bank, answers = checked_run(record)
+    order = run_order(record, bank, answers)
+    questions = [bank.question(bank.position(qid)) for qid in order]
+    overall, per_variable, scored_qs_sorted = compute_scores(questions, answers, bank=bank)
+    return readout_record(bank.lens, answers, overall, per_variable, scored_qs_sorted, order=order)
+
+def score_items(items, fmt):
+    """(output_line or None, error or None) per raw item, in input order."""
+    for item in items:
+        try:
+            yield json.dumps(score_record(parse_item(item, fmt)), ensure_ascii=False), None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            yield None, str(e)
+
+def _score_chunk(args):
+    items, fmt = args
+    return list(score_items(items, fmt))
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def score_stream(items, fmt, workers=1, chunk_size=2000):
+    if workers <= 1:
+        yield from score_items(items, fmt)
+        return
+    # keep at most 2 chunks per worker in flight so memory stays bounded
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunked(items, chunk_size):
+            pending.append(pool.submit(_score_chunk, (chunk, fmt)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+# --------------------------
+# Entry point
+# --------------------------
+def add_score_parser(subparsers):
+    p = subparsers.add_parser("score", help="score JSONL/CSV runs offline")
+    p.add_argument("input", help="input file, or - for stdin")
+    p.add_argument("-o", "--output", default="-", help="output JSONL file (default stdout)")
+    p.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: from extension)")
+    p.add_argument("--workers", type=int, default=1, help="score in N worker processes")
+    p.add_argument("--chunk-size", type=int, default=2000, help="records per worker chunk")
+    p.set_defaults(func=run_score)
+
+def run_score(args):
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    n_ok = n_err = 0
+    try:
+        for line_no, (line, error) in enumerate(score_stream(read_items(src, fmt), fmt, args.workers, args.chunk_size), 1):
+            if error is not None:
+                n_err += 1
+                print(f"record {line_no}: {error}", file=sys.stderr)
+                continue
+            dst.write(line + "\n")
+            n_ok += 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"scored {n_ok} runs, {n_err} errors", file=sys.stderr)
+    return 1 if n_err else 0
+
+def add_backfill_parser(subparsers):
+    p = subparsers.add_parser("backfill", help="re-score stored runs under the current scoring config")
+    p.add_argument("--store", help="run store (default: $WEATHER_RUN_STORE or runs.sqlite3)")
+    p.add_argument("--chunk-size", type=int, default=20000, help="runs re-scored per checkpointed transaction")
+    p.set_defaults(func=run_backfill)
+
+def run_backfill(args):
+    from .backfill import backfill
+    from .store import DEFAULT_PATH
+
+    stats = backfill(args.store or DEFAULT_PATH, args.chunk_size, log=lambda msg: print(msg, file=sys.stderr))
+    print(f"re-scored {sum(stats.values())} runs ({', '.join(f'{k}: {n}' for k, n in stats.items())})", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.engine")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_score_parser(subparsers)
+    add_backfill_parser(subparsers)
+    args = parser.parse_args(argv)
+    return args.func(args)
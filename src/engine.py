@@ -1,175 +1,77 @@
 """
-Universal Question Bank — v1
-Questions are domain-agnostic.
-They capture variables, not feelings.
+Engine — the headless core
+Everything a run needs without a UI: the compiled lens banks, scoring,
+zones, readout picks and lens language. Importing this never touches
+Streamlit; NumPy batch scoring, the run store, checkpoints, norms and
+the CLI load lazily on first attribute access, so workers and tests
+import it in milliseconds.
+
+    python -m src.engine score runs.jsonl [-o scored.jsonl] [--workers N]
+    python -m src.engine backfill [--store runs.sqlite3]   (after a scoring config change)
 """
 
-QUESTION_BANK = [
-    # -------- BASELINE STABILITY --------
-    {
-        "id": "base_01",
-        "text": "How many days this week did you wake up already feeling behind?",
-        "variable": "Baseline Stability",
-        "phase": 1,
-        "weight": 1.0,
-    },
-    {
-        "id": "base_02",
-        "text": "How often does a single unexpected issue destabilize your entire day?",
-        "variable": "Baseline Stability",
-        "phase": 1,
-        "weight": 1.1,
-    },
-    {
-        "id": "base_03",
-        "text": "How predictable are your days from start to finish?",
-        "variable": "Baseline Stability",
-        "phase": 1,
-        "weight": 0.9,
-    },
-    {
-        "id": "base_04",
-        "text": "How often do you feel like you are operating without a buffer?",
-        "variable": "Baseline Stability",
-        "phase": 1,
-        "weight": 1.1,
-    },
+from importlib import import_module
+
+from . import metrics, trends
+from .adaptive import AdaptiveSelector
+from .bank import BANKS, LENSES, QUESTION_BANK, CompiledLens, compile_banks, compile_lens
+from .incremental import RunningScorer
+from .lenses import (
+    READOUT_INTROS,
+    SCALE_LABELS,
+    SCALE_OPTIONS,
+    TRANSLATIONS,
+    lens_readout_intro,
+    lens_translation,
+)
+from .question_bank import QUESTION_BANK as UNIVERSAL_QUESTION_BANK
+from .readout import Readout, build_readout
+from .runtoken import TokenError, decode_run, encode_run
+from .sampling import quotas, sample_positions
+from .session import RunState, session_bytes
+from .scoring import (
+    VARIABLE_WEIGHTS,
+    ZONES,
+    clamp,
+    compute_scores,
+    export_record,
+    next_focus_targets,
+    smallest_lever,
+    weakest_and_strongest,
+    weakest_lever,
+    zone_name,
+)
+
+# name -> module, imported on first access (PEP 562)
+_LAZY = {
+    "BatchScorer": ".batch",
+    "BatchScores": ".batch",
+    "Checkpoints": ".checkpoints",
+    "Norms": ".norms",
+    "QuantileSketch": ".sketch",
+    "RunStore": ".store",
+    "shared_store": ".store",
+    "score_record": ".cli",
+    "score_stream": ".cli",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __package__), name)
+    globals()[name] = value
+    return value
 
-    # -------- LOAD / CAPACITY --------
-    {
-        "id": "load_01",
-        "text": "How often do you feel drained before the main part of your day even begins?",
-        "variable": "Load",
-        "phase": 1,
-        "weight": 1.2,
-    },
-    {
-        "id": "load_02",
-        "text": "How often do you carry pressure without a clear source?",
-        "variable": "Load",
-        "phase": 1,
-        "weight": 1.2,
-    },
-    {
-        "id": "load_03",
-        "text": "How often do you delay rest because it feels unsafe or irresponsible?",
-        "variable": "Load",
-        "phase": 2,
-        "weight": 1.3,
-    },
-    {
-        "id": "load_04",
-        "text": "How often do you feel alert but unable to act?",
-        "variable": "Load",
-        "phase": 2,
-        "weight": 1.3,
-    },
-    {
-        "id": "load_05",
-        "text": "How often does your body signal exhaustion before your mind agrees?",
-        "variable": "Load",
-        "phase": 2,
-        "weight": 1.2,
-    },
 
-    # -------- SIGNAL CLARITY --------
-    {
-        "id": "signal_01",
-        "text": "How often are you unsure whether what you’re doing is actually helping?",
-        "variable": "Signal Clarity",
-        "phase": 1,
-        "weight": 1.1,
-    },
-    {
-        "id": "signal_02",
-        "text": "How often do you change behavior without knowing what caused the last outcome?",
-        "variable": "Signal Clarity",
-        "phase": 2,
-        "weight": 1.2,
-    },
-    {
-        "id": "signal_03",
-        "text": "How often does silence feel like feedback?",
-        "variable": "Signal Clarity",
-        "phase": 2,
-        "weight": 1.3,
-    },
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
 
-    # -------- FEEDBACK SAFETY --------
-    {
-        "id": "feedback_01",
-        "text": "How often do you avoid speaking up because it will create more work than relief?",
-        "variable": "Feedback Safety",
-        "phase": 1,
-        "weight": 1.2,
-    },
-    {
-        "id": "feedback_02",
-        "text": "How often do issues get addressed only after they become unavoidable?",
-        "variable": "Feedback Safety",
-        "phase": 2,
-        "weight": 1.3,
-    },
-    {
-        "id": "feedback_03",
-        "text": "How often do things smooth over without actually changing?",
-        "variable": "Feedback Safety",
-        "phase": 2,
-        "weight": 1.2,
-    },
 
-    # -------- INCENTIVES --------
-    {
-        "id": "incentive_01",
-        "text": "How often are you rewarded for endurance rather than improvement?",
-        "variable": "Incentives",
-        "phase": 1,
-        "weight": 1.2,
-    },
-    {
-        "id": "incentive_02",
-        "text": "How often do short-term fixes undermine longer-term outcomes?",
-        "variable": "Incentives",
-        "phase": 2,
-        "weight": 1.3,
-    },
+if __name__ == "__main__":
+    import sys
 
-    # -------- CONSTRAINTS --------
-    {
-        "id": "constraint_01",
-        "text": "How many of your current limits feel non-negotiable?",
-        "variable": "Constraints",
-        "phase": 1,
-        "weight": 1.2,
-    },
-    {
-        "id": "constraint_02",
-        "text": "How often do plans fail because they ignore one obvious constraint?",
-        "variable": "Constraints",
-        "phase": 2,
-        "weight": 1.3,
-    },
+    from .cli import main
 
-    # -------- TRAJECTORY / DRIFT --------
-    {
-        "id": "drift_01",
-        "text": "How often do weeks blur together without a sense of direction?",
-        "variable": "Trajectory",
-        "phase": 1,
-        "weight": 1.2,
-    },
-    {
-        "id": "drift_02",
-        "text": "How often does effort result in continuation rather than relief?",
-        "variable": "Trajectory",
-        "phase": 2,
-        "weight": 1.3,
-    },
-    {
-        "id": "drift_03",
-        "text": "How often do you feel like you are maintaining position instead of changing it?",
-        "variable": "Trajectory",
-        "phase": 2,
-        "weight": 1.4,
-    },
-]
+    sys.exit(main())
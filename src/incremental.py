@@ -0,0 +1,122 @@
+"""
+Incremental scoring — one run in progress
+Keeps per-variable running aggregates (weighted sums + Welford
+mean/M2 of the 0..4 scores), packed STRIDE doubles per variable in one
+array, so every answer set/change is O(1) and a partial overall/zone
+preview is always available while answering. RunState keeps the same
+packed array next to its answers; RunningScorer wraps it by qid.
+Final results still come from scoring.compute_scores.
+"""
+
+from array import array
+
+from .scoring import VARIABLE_WEIGHTS, clamp, zone_name
+
+STRIDE = 5  # per variable: sum of score * weight, sum of weight, count, Welford mean, Welford M2
+NUM, DEN, COUNT, MEAN, M2 = range(STRIDE)
+
+
+# --------------------------
+# Packed aggregates
+# --------------------------
+def new_aggregates(n_vars):
+    """Zeroed aggregates for n_vars variables, one flat array of doubles."""
+    return array("d", bytes(8 * STRIDE * n_vars))
+
+def fold(agg, bank, pos, answer, sign=1):
+    """Add (sign=1) or remove (sign=-1) one answer to bank position `pos`; O(1)."""
+    i = STRIDE * bank.var_codes[pos]
+    w = bank.weights[pos]
+    s = (4 - answer) if bank.is_reverse(pos) else answer  # 0..4 higher is better
+    if sign > 0:
+        agg[i + NUM] += s * w
+        agg[i + DEN] += w
+        agg[i + COUNT] += 1
+        delta = s - agg[i + MEAN]
+        agg[i + MEAN] += delta / agg[i + COUNT]
+        agg[i + M2] += delta * (s - agg[i + MEAN])
+        return
+    n = agg[i + COUNT]
+    if n <= 1:
+        agg[i:i + STRIDE] = array("d", bytes(8 * STRIDE))
+        return
+    agg[i + NUM] -= s * w
+    agg[i + DEN] -= w
+    old_mean = agg[i + MEAN]
+    agg[i + COUNT] = n - 1
+    agg[i + MEAN] = (n * old_mean - s) / (n - 1)
+    m2 = agg[i + M2] - (s - old_mean) * (s - agg[i + MEAN])
+    # scores are integers, so a true M2 is 0 or at least 1/n; snap drift
+    agg[i + M2] = m2 if m2 > 1e-9 else 0.0
+
+def per_variable(agg, variables):
+    """Same shape as compute_scores' per_variable, answered variables only."""
+    out = {}
+    for code, v in enumerate(variables):
+        i = STRIDE * code
+        n = agg[i + COUNT]
+        if not n:
+            continue
+        den = agg[i + DEN] if agg[i + DEN] else 1.0
+        mean_0_4 = agg[i + NUM] / den
+        pct = (mean_0_4 / 4.0) * 100.0
+        vol = 0.0
+        if n >= 2:
+            vol = (((agg[i + M2] / n) ** 0.5) / 2.0) * 100.0
+        out[v] = {
+            "mean_0_4": mean_0_4,
+            "pct": pct,
+            "zone": zone_name(pct),
+            "volatility": clamp(vol, 0, 100),
+        }
+    return out
+
+def preview(agg, variables, variable_weights=None):
+    """Partial readout so far: (overall, zone, per_variable)."""
+    variable_weights = VARIABLE_WEIGHTS if variable_weights is None else variable_weights
+    per_var = per_variable(agg, variables)
+    overall_num = 0.0
+    overall_den = 0.0
+    for v, info in per_var.items():
+        vw = float(variable_weights.get(v, 1.0))
+        overall_num += info["pct"] * vw
+        overall_den += vw
+    overall = (overall_num / overall_den) if overall_den else 0.0
+    return overall, zone_name(overall), per_var
+
+
+class RunningScorer:
+    """Answers keyed by qid over packed aggregates (RunState keeps the same aggregates per slot)."""
+
+    def __init__(self, bank, variable_weights=None):
+        self.bank = bank
+        self.variable_weights = VARIABLE_WEIGHTS if variable_weights is None else variable_weights
+        self.answers = {}  # qid -> answer (0..4)
+        self.agg = new_aggregates(len(bank.variables))
+
+    def __len__(self):
+        return len(self.answers)
+
+    def set_answer(self, qid: str, answer: int):
+        """Record or change one answer; a no-op if it did not change."""
+        answer = int(answer)
+        old = self.answers.get(qid)
+        if old == answer:
+            return
+        pos = self.bank.index[qid]
+        if old is not None:
+            fold(self.agg, self.bank, pos, old, -1)
+        fold(self.agg, self.bank, pos, answer)
+        self.answers[qid] = answer
+
+    def clear_answer(self, qid: str):
+        old = self.answers.pop(qid, None)
+        if old is not None:
+            fold(self.agg, self.bank, self.bank.index[qid], old, -1)
+
+    def per_variable(self):
+        return per_variable(self.agg, self.bank.variables)
+
+    def preview(self):
+        """Partial readout so far: (overall, zone, per_variable)."""
+        return preview(self.agg, self.bank.variables, self.variable_weights)
@@ -0,0 +1,64 @@
+"""
+Lens language — how each lens names the shared variables
+Static, read-only tables built once at import and shared by every
+session and worker in the process.
+"""
+
+from types import MappingProxyType
+
+# --------------------------
+# Universal Scale (0–4)
+# --------------------------
+SCALE_LABELS = MappingProxyType({
+    0: "0 — Not at all / Never",
+    1: "1 — Rarely",
+    2: "2 — Sometimes",
+    3: "3 — Often",
+    4: "4 — Almost always",
+})
+SCALE_OPTIONS = tuple(SCALE_LABELS)
+
+# --------------------------
+# Lens translation
+# Same variable names, but translated to lens language
+# --------------------------
+TRANSLATIONS = MappingProxyType({
+    "Interpersonal": MappingProxyType({
+        "Baseline": "Emotional baseline under contact",
+        "Clarity": "What you want / what’s true",
+        "Resources": "Support + emotional bandwidth",
+        "Boundaries": "Limits + self-respect in action",
+        "Execution": "Having the talk / doing the thing",
+        "Feedback": "Repair, learning, reality-checking",
+    }),
+    "Financial": MappingProxyType({
+        "Baseline": "Stability under money stress",
+        "Clarity": "Numbers + priorities clarity",
+        "Resources": "Income/buffer/tooling",
+        "Boundaries": "Spending boundaries + exposure control",
+        "Execution": "Bills/actions actually done",
+        "Feedback": "Review, adjust, remove leaks",
+    }),
+    "Big Picture": MappingProxyType({
+        "Baseline": "Stability + momentum",
+        "Clarity": "North star + next step",
+        "Resources": "Energy/support/environment",
+        "Boundaries": "Focus protection + saying no",
+        "Execution": "Shipping + completion",
+        "Feedback": "Measurement + iteration",
+    }),
+})
+
+READOUT_INTROS = MappingProxyType({
+    "Interpersonal": "This readout interprets scores through **relationship dynamics**: tension, clarity, boundaries, follow-through.",
+    "Financial": "This readout interprets scores through **stability + money control**: clarity, buffer, boundaries, execution.",
+    "Big Picture": "This readout interprets scores through **mission control**: clarity, focus, resources, execution, feedback loops.",
+})
+
+
+def lens_readout_intro(lens: str) -> str:
+    return READOUT_INTROS.get(lens, READOUT_INTROS["Big Picture"])
+
+
+def lens_translation(lens: str, variable: str) -> str:
+    return TRANSLATIONS.get(lens, {}).get(variable, variable)
@@ -0,0 +1,299 @@
+"""
+Metrics — hot-path timers, counters and an opt-in rerun profiler
+Off unless WEATHER_METRICS is set. While off, timed() hands back the
+function undecorated, timer() returns one shared no-op context manager
+and count()/observe() return on their first line, so the instrumented
+code pays a global lookup at most.
+
+    WEATHER_METRICS=json:-                     one JSON line per interval on stderr
+    WEATHER_METRICS=json:/var/log/weather.jsonl
+    WEATHER_METRICS=prom:/var/lib/node_exporter/weather.prom
+                                               Prometheus text file, rewritten per interval
+    WEATHER_METRICS=panel                      in memory only (pages/2_Admin.py)
+    WEATHER_METRICS_INTERVAL=10                seconds between sink writes
+
+Sinks can be combined with commas ("json:-,prom:/tmp/w.prom"). Timers
+are summaries (count, sum, max) named "<name>.seconds".
+
+    WEATHER_PROFILE=cpu:50                     cProfile every 50th rerun -> .pstats
+    WEATHER_PROFILE=mem:50                     tracemalloc top allocations -> .txt
+    WEATHER_PROFILE_DIR=/tmp/weather-profiles
+
+One rerun is profiled at a time. cProfile sees only that rerun's
+thread; tracemalloc sees every thread while it runs. The profiler works
+with or without WEATHER_METRICS.
+"""
+
+import atexit
+import contextlib
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+
+SPEC = os.environ.get("WEATHER_METRICS", "").strip()
+ENABLED = bool(SPEC)
+INTERVAL = float(os.environ.get("WEATHER_METRICS_INTERVAL", "10"))
+PROFILE_MODE, _, _every = os.environ.get("WEATHER_PROFILE", "").partition(":")
+PROFILE_EVERY = int(_every or 100) if PROFILE_MODE in ("cpu", "mem") else 0
+PROFILE_DIR = os.environ.get("WEATHER_PROFILE_DIR")  # default: <tmp>/weather-profiles
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_summaries = {}   # name -> [count, sum, max]
+_NULL = contextlib.nullcontext()
+
+
+# --------------------------
+# Recording
+# --------------------------
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def gauge(name, value):
+    if not ENABLED:
+        return
+    _gauges[name] = value
+
+def observe(name, value):
+    if not ENABLED:
+        return
+    with _lock:
+        s = _summaries.get(name)
+        if s is None:
+            _summaries[name] = [1, value, value]
+            return
+        s[0] += 1
+        s[1] += value
+        if value > s[2]:
+            s[2] = value
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name + ".seconds"
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+
+
+def timer(name):
+    """with timer("sample"): ... records "sample.seconds"."""
+    return _Timer(name) if ENABLED else _NULL
+
+def timed(name):
+    """Decorator form of timer(); a no-op (the function itself) while metrics are off."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with _Timer(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# --------------------------
+# Reruns and sessions
+# --------------------------
+_rerun_seq = itertools.count(1)
+_profiling = threading.Lock()
+_sessions = weakref.WeakSet()
+
+
+class _SessionTag:
+    """Lives in one session's state; the WeakSet drops it when the session is gone."""
+    __slots__ = ("__weakref__",)
+
+
+def track_session(session_state):
+    """Count a new session once and keep sessions.active current."""
+    if not ENABLED or "_metrics_session" in session_state:
+        return
+    tag = session_state["_metrics_session"] = _SessionTag()
+    _sessions.add(tag)
+    count("sessions.started")
+
+
+def begin_rerun(stage):
+    """Token for end_rerun(), or None when neither metrics nor the profiler are on."""
+    if not ENABLED and not PROFILE_EVERY:
+        return None
+    profiler = None
+    seq = next(_rerun_seq)
+    if PROFILE_EVERY and seq % PROFILE_EVERY == 0 and _profiling.acquire(blocking=False):
+        profiler = _start_profile()
+        if profiler is None:
+            _profiling.release()
+    return (stage, time.perf_counter(), profiler, seq)
+
+def end_rerun(token, completed=True):
+    """
+    Close a begin_rerun() token; call it however the script ends. A
+    rerun cut short (st.rerun(), st.stop(), an error) is not recorded,
+    its replacement is, but its profile is still stopped and written.
+    """
+    if token is None:
+        return
+    stage, t0, profiler, seq = token
+    if completed:
+        observe(f"rerun.{stage}.seconds", time.perf_counter() - t0)
+        count(f"rerun.{stage}")
+        gauge("sessions.active", len(_sessions))
+    if profiler is not None:
+        try:
+            _stop_profile(profiler, f"{os.getpid()}-{seq}-{stage}")
+        finally:
+            _profiling.release()
+
+
+def _start_profile():
+    if PROFILE_MODE == "cpu":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler already owns this interpreter
+            return None
+        return profiler
+    import tracemalloc
+
+    tracemalloc.start()
+    return tracemalloc
+
+def profile_dir():
+    if PROFILE_DIR:
+        return PROFILE_DIR
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), "weather-profiles")
+
+def _stop_profile(profiler, label):
+    out = profile_dir()
+    os.makedirs(out, exist_ok=True)
+    stem = os.path.join(out, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}")
+    if PROFILE_MODE == "cpu":
+        profiler.disable()
+        profiler.dump_stats(stem + ".pstats")
+        return
+    snapshot = profiler.take_snapshot()
+    profiler.stop()
+    with open(stem + ".txt", "w", encoding="utf-8") as f:
+        for stat in snapshot.statistics("lineno")[:40]:
+            f.write(f"{stat}\n")
+
+
+# --------------------------
+# Sinks
+# --------------------------
+def snapshot():
+    with _lock:
+        summaries = {
+            name: {"count": n, "sum": total, "max": peak, "mean": total / n}
+            for name, (n, total, peak) in _summaries.items()
+        }
+        return {
+            "ts": time.time(),
+            "pid": os.getpid(),
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "summaries": summaries,
+        }
+
+
+class JsonLinesSink:
+    def __init__(self, path="-"):
+        self.path = path
+
+    def write(self, snap):
+        line = json.dumps(snap, separators=(",", ":"))
+        if self.path == "-":
+            print(line, file=sys.stderr, flush=True)
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class PrometheusSink:
+    """Text exposition format, written atomically (node_exporter's textfile collector)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def _name(name):
+        return "weather_" + "".join(c if c.isascii() and (c.isalnum() or c == "_") else "_" for c in name)
+
+    def write(self, snap):
+        labels = f'{{pid="{snap["pid"]}"}}'
+        lines = []
+        for name, value in sorted(snap["counters"].items()):
+            lines += [f"# TYPE {self._name(name)}_total counter", f"{self._name(name)}_total{labels} {value}"]
+        for name, value in sorted(snap["gauges"].items()):
+            lines += [f"# TYPE {self._name(name)} gauge", f"{self._name(name)}{labels} {value}"]
+        for name, s in sorted(snap["summaries"].items()):
+            base = self._name(name)
+            lines += [
+                f"# TYPE {base} summary",
+                f"{base}_count{labels} {s['count']}",
+                f"{base}_sum{labels} {s['sum']}",
+                f"# TYPE {base}_max gauge",
+                f"{base}_max{labels} {s['max']}",
+            ]
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+
+def sinks_from(spec):
+    sinks = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, target = part.partition(":")
+        if kind == "json":
+            sinks.append(JsonLinesSink(target or "-"))
+        elif kind == "prom":
+            if not target:
+                raise ValueError("WEATHER_METRICS prom: needs a file path")
+            sinks.append(PrometheusSink(target))
+        elif kind != "panel":
+            raise ValueError(f"unknown WEATHER_METRICS sink {kind!r} (json, prom, panel)")
+    return sinks
+
+SINKS = sinks_from(SPEC) if ENABLED else []
+
+
+def flush():
+    if not SINKS:
+        return
+    snap = snapshot()
+    for sink in SINKS:
+        try:
+            sink.write(snap)
+        except OSError as e:
+            print(f"metrics: {type(sink).__name__} failed: {e}", file=sys.stderr)
+
+def _flush_loop():
+    while True:
+        time.sleep(INTERVAL)
+        flush()
+
+if SINKS:
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+    atexit.register(flush)
@@ -0,0 +1,136 @@
+"""
+Norms — percentiles against everyone who took a lens
+One QuantileSketch (sketch.py) per lens and variable, plus one for the
+overall score, stored as a blob in the run store. RunStore's writer
+merges every batch into them (see store.py); separate stores combine
+with merge_norms(). The raw population is never kept or scanned for a
+lookup.
+
+Norms is the read side: it caches a lens's sketches for max_age
+seconds, and percentile() is a bisect over a prebuilt view.
+"""
+
+import time
+
+from .rollups import OVERALL
+from .sketch import QuantileSketch
+
+MIN_POPULATION = 30  # below this a percentile says more about noise than people
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS norm_sketches (
+    lens TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sketch BLOB NOT NULL,
+    PRIMARY KEY (lens, variable)
+) WITHOUT ROWID;
+"""
+
+
+# --------------------------
+# Update
+# --------------------------
+def _merge(conn, sketches):
+    """Merge {(lens, variable): QuantileSketch} into the stored sketches."""
+    rows = []
+    for (lens, variable), sketch in sketches.items():
+        row = conn.execute(
+            "SELECT sketch FROM norm_sketches WHERE lens = ? AND variable = ?", (lens, variable)
+        ).fetchone()
+        if row is not None:
+            sketch = QuantileSketch.from_bytes(row[0]).merge(sketch)
+        rows.append((lens, variable, sketch.n, sketch.to_bytes()))
+    conn.executemany(
+        "INSERT INTO norm_sketches (lens, variable, n, sketch) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (lens, variable) DO UPDATE SET n = excluded.n, sketch = excluded.sketch",
+        rows,
+    )
+
+
+def update_norms(conn, runs):
+    """runs: same tuples as rollups.update_rollups. Sketches the batch, then one merge per key."""
+    batch = {}
+    for ts, lens, overall, zone, lever, variables in runs:
+        for v, pct in [(OVERALL, overall)] + [(v, pct) for v, pct, _, _ in variables]:
+            sketch = batch.get((lens, v))
+            if sketch is None:
+                sketch = batch[lens, v] = QuantileSketch()
+            sketch.add(pct)
+    _merge(conn, batch)
+
+
+def merge_norms(conn, other):
+    """Fold every sketch from another store's connection into this one (run inside a transaction)."""
+    _merge(conn, {
+        (lens, variable): QuantileSketch.from_bytes(blob)
+        for lens, variable, blob in other.execute("SELECT lens, variable, sketch FROM norm_sketches")
+    })
+
+
+def rebuild_norms(conn, chunk_size=10000):
+    """Drop and refold every stored run (e.g. for a store that predates norms)."""
+    conn.execute("DELETE FROM norm_sketches")
+    sketches = {}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, lens, overall FROM runs WHERE id > ? ORDER BY id LIMIT ?", (last_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            break
+        lo, hi = rows[0][0], rows[-1][0]
+        lens_of = {}
+        for run_id, lens, overall in rows:
+            lens_of[run_id] = lens
+            sketches.setdefault((lens, OVERALL), QuantileSketch()).add(overall)
+        for run_id, v, pct in conn.execute(
+            "SELECT run_id, variable, pct FROM run_variables WHERE run_id BETWEEN ? AND ?", (lo, hi)
+        ):
+            sketches.setdefault((lens_of[run_id], v), QuantileSketch()).add(pct)
+        last_id = hi
+    _merge(conn, sketches)
+
+
+# --------------------------
+# Query
+# --------------------------
+def load_sketches(conn, lens):
+    """variable -> QuantileSketch for one lens, views prebuilt."""
+    out = {}
+    for variable, blob in conn.execute("SELECT variable, sketch FROM norm_sketches WHERE lens = ?", (lens,)):
+        sketch = out[variable] = QuantileSketch.from_bytes(blob)
+        sketch.view()
+    return out
+
+
+class Norms:
+    """Percentile lookups for a RunStore, shared by every session in the process."""
+
+    def __init__(self, store, max_age=30.0, min_population=MIN_POPULATION):
+        self.store = store
+        self.max_age = max_age
+        self.min_population = min_population
+        self._cache = {}  # lens -> (loaded at, {variable: sketch})
+
+    def sketches(self, lens):
+        now = time.monotonic()
+        hit = self._cache.get(lens)
+        if hit is None or now - hit[0] > self.max_age:
+            hit = self._cache[lens] = (now, load_sketches(self.store.reader(), lens))
+        return hit[1]
+
+    def population(self, lens, variable=OVERALL):
+        sketch = self.sketches(lens).get(variable)
+        return sketch.n if sketch is not None else 0
+
+    def percentile(self, lens, variable, pct):
+        """0..100 share of the lens's runs scoring below pct, or None while the population is small."""
+        sketch = self.sketches(lens).get(variable)
+        if sketch is None or sketch.n < self.min_population:
+            return None
+        return 100.0 * sketch.rank(pct)
+
+    def lookup(self, lens):
+        """percentile(variable, pct) for one lens, in the shape build_readout takes."""
+        return lambda variable, pct: self.percentile(lens, variable, pct)
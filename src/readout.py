@@ -0,0 +1,162 @@
+"""
+Readout — the results page as data
+build_readout() turns one scored run into a frozen Readout: every row,
+pick and line the results page shows, already translated into the
+lens's language. Readout.markdown renders the whole report as one document
+(computed once per Readout), so the page is a handful of elements
+instead of one per line; to_dict() is the same readout for JSON, logs
+or anything else without a UI.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from functools import cached_property
+
+from . import metrics
+from .lenses import lens_readout_intro, lens_translation
+from .rollups import OVERALL
+from .trends import Trend, advance, arrow
+from .scoring import (
+    VARIABLE_WEIGHTS,
+    export_record,
+    next_focus_targets,
+    weakest_and_strongest,
+    zone_name,
+)
+
+DISTORTIONS = 5  # lowest-scored questions listed
+
+
+@dataclass(frozen=True)
+class VariableRow:
+    variable: str
+    label: str
+    pct: float
+    zone: str
+    volatility: float
+    percentile: float = None  # vs. everyone who took the lens (norms.py), when known
+    trend: Trend = None       # this user's history in the lens including this run (trends.py)
+
+
+@dataclass(frozen=True)
+class ItemRow:
+    id: str
+    text: str
+    variable: str
+    score: int
+    weight: float
+    gain: float = None        # overall points per +1 here (sensitivity.py), levers only
+    var_gain: float = None    # the same step on its own variable
+    flip_steps: int = None    # +1 steps that move the variable up a zone, None if out of reach
+
+
+@dataclass(frozen=True)
+class Readout:
+    lens: str
+    intro: str
+    overall: float
+    zone: str
+    variables: tuple          # VariableRow, in VARIABLE_WEIGHTS order
+    strongest: VariableRow    # None when nothing was answered
+    risk: VariableRow
+    distortions: tuple        # ItemRow, lowest score first
+    lever: ItemRow            # best lever by marginal impact (sensitivity.rank_levers), or None
+    next_targets: tuple       # VariableRow
+    export: dict              # scoring.export_record
+    overall_percentile: float = None
+    trend: Trend = None       # the overall score's history, like VariableRow.trend
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @cached_property
+    def markdown(self) -> str:
+        """The report below the overall score, as one markdown document."""
+        with metrics.timer("readout.render"):
+            return self._markdown()
+
+    def _markdown(self):
+        lines = ["### Variable Scores"]
+        lines += [
+            f"- **{r.label}**: **{r.pct:.1f}** ({r.zone}) — volatility **{r.volatility:.0f}/100**"
+            + (f" — {ordinal(r.percentile)} percentile" if r.percentile is not None else "")
+            + (f" — {arrow(r.trend.slope)} {r.trend.delta:+.1f} vs last run" if r.trend and r.trend.delta is not None else "")
+            for r in self.variables
+        ]
+        if self.risk is not None:
+            lines += [
+                "", "### Where you are",
+                f"- **Strongest area:** {self.strongest.label} (**{self.strongest.pct:.1f}**)",
+                "", "### Where problems are arising",
+                f"- **Primary risk area:** {self.risk.label} (**{self.risk.pct:.1f}**, {self.risk.zone})",
+                "", "### Dominant distortions (lowest signals)",
+            ]
+            lines += [f"- {i.text}  \n  ↳ scored **{i.score}/4** (weight {i.weight})" for i in self.distortions]
+            lines += ["", "### Smallest lever (best first adjustment)"]
+            if self.lever is not None:
+                lever = self.lever
+                lines += [f"**Do this first:** {lever.text}"]
+                # variables outside VARIABLE_WEIGHTS have no row to explain the lever with
+                area = next((r for r in self.variables if r.variable == lever.variable), None)
+                if area is not None:
+                    why = (
+                        f"each point up here adds **+{lever.gain:.1f}** to your overall score "
+                        f"({area.label} +{lever.var_gain:.1f})"
+                    )
+                    if lever.flip_steps is not None:
+                        steps = "one point" if lever.flip_steps == 1 else f"{lever.flip_steps} points"
+                        why += f", and {steps} lifts {area.label} out of {area.zone}"
+                    else:
+                        why += ", more than any other answer"
+                    lines += ["", f"*Why: {why}.*"]
+            lines += ["", "### Areas that need adjustment to continue evaluation", "- **Next focus targets:**"]
+            lines += [f"  - {r.label} ({r.pct:.1f})" for r in self.next_targets]
+        return "\n".join(lines)
+
+
+def ordinal(p) -> str:
+    n = min(99, max(1, round(p)))
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def _item(t, gain=None, var_gain=None, flip_steps=None):
+    v, s, w, q, a = t
+    return ItemRow(q["id"], q["text"], v, s, w, gain, var_gain, flip_steps)
+
+
+@metrics.timed("readout.build")
+def build_readout(lens, overall, per_variable, scored_qs_sorted, answers, percentile=None, history=None) -> Readout:
+    """
+    Readout for one run, from compute_scores' output and the answers it
+    scored, in the order it was given their questions. percentile: optional (variable, pct) -> 0..100 or None, e.g.
+    Norms.lookup(lens); the overall score is looked up as rollups.OVERALL.
+    history: optional variable -> Trend before this run (RunStore.user_trends),
+    advanced here by this run's scores.
+    """
+    ts = time.time()
+    def row(v):
+        info = per_variable[v]
+        p = percentile(v, info["pct"]) if percentile else None
+        t = advance(history.get(v), info["pct"], ts) if history is not None else None
+        return VariableRow(v, lens_translation(lens, v), info["pct"], info["zone"], info["volatility"], p, t)
+
+    from .sensitivity import rank_levers  # deferred: NumPy is not needed until a run finishes
+
+    lowest, highest = weakest_and_strongest(per_variable)
+    levers = rank_levers(scored_qs_sorted, per_variable, order=answers)
+    return Readout(
+        lens=lens,
+        intro=lens_readout_intro(lens),
+        overall=overall,
+        zone=zone_name(overall),
+        variables=tuple(row(v) for v in VARIABLE_WEIGHTS if v in per_variable),
+        strongest=row(highest) if highest is not None else None,
+        risk=row(lowest) if lowest is not None else None,
+        distortions=tuple(_item(t) for t in scored_qs_sorted[:DISTORTIONS]) if lowest is not None else (),
+        lever=_item(*levers[0]) if levers else None,
+        next_targets=tuple(row(v) for v in next_focus_targets(per_variable, lowest)) if lowest is not None else (),
+        export=export_record(lens, overall, per_variable, answers),
+        overall_percentile=percentile(OVERALL, overall) if percentile else None,
+        trend=advance(history.get(OVERALL), overall, ts) if history is not None else None,
+    )
@@ -0,0 +1,181 @@
+"""
+Rollups — precomputed aggregates over finished runs
+Per day / lens / variable: count, pct sum + sum of squares, the
+RED/YELLOW/GREEN mix and a 10-point pct histogram, plus how often each
+question was the "Smallest lever". RunStore's writer folds every batch
+into these tables (see store.py), so the dashboard reads a few rows per
+day instead of rescanning runs.
+"""
+
+import time
+from collections import Counter, defaultdict
+
+OVERALL = "(overall)"  # variable name used for the overall score's rows
+BUCKET_WIDTH = 10      # histogram buckets: [0,10) .. [90,100]
+N_BUCKETS = 100 // BUCKET_WIDTH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_variables (
+    day TEXT NOT NULL,
+    lens TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    sum_pct REAL NOT NULL,
+    sum_sq REAL NOT NULL,
+    red INTEGER NOT NULL,
+    yellow INTEGER NOT NULL,
+    green INTEGER NOT NULL,
+    PRIMARY KEY (lens, variable, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_histogram (
+    day TEXT NOT NULL,
+    lens TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (lens, variable, day, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_levers (
+    day TEXT NOT NULL,
+    lens TEXT NOT NULL,
+    qid TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (lens, day, qid)
+) WITHOUT ROWID;
+"""
+
+
+def day_of(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def bucket_of(pct: float) -> int:
+    return min(N_BUCKETS - 1, max(0, int(pct // BUCKET_WIDTH)))
+
+
+# --------------------------
+# Update
+# --------------------------
+def update_rollups(conn, runs):
+    """
+    runs: iterable of (ts, lens, overall, zone, lever_qid, variables) where
+    variables is [(variable, pct, zone, volatility), ...] as compute_scores
+    produced them. Aggregates in memory first, then one upsert per key.
+    """
+    stats = defaultdict(lambda: [0, 0.0, 0.0, 0, 0, 0])
+    hist = Counter()
+    levers = Counter()
+    zone_col = {"RED": 3, "YELLOW": 4, "GREEN": 5}
+
+    for ts, lens, overall, zone, lever, variables in runs:
+        day = day_of(ts)
+        for v, pct, vzone in [(OVERALL, overall, zone)] + [(v, pct, z) for v, pct, z, _ in variables]:
+            s = stats[day, lens, v]
+            s[0] += 1
+            s[1] += pct
+            s[2] += pct * pct
+            s[zone_col[vzone]] += 1
+            hist[day, lens, v, bucket_of(pct)] += 1
+        if lever is not None:
+            levers[day, lens, lever] += 1
+
+    conn.executemany(
+        "INSERT INTO rollup_variables (day, lens, variable, n, sum_pct, sum_sq, red, yellow, green) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (lens, variable, day) DO UPDATE SET "
+        "n = n + excluded.n, sum_pct = sum_pct + excluded.sum_pct, sum_sq = sum_sq + excluded.sum_sq, "
+        "red = red + excluded.red, yellow = yellow + excluded.yellow, green = green + excluded.green",
+        [(*key, *s) for key, s in stats.items()],
+    )
+    conn.executemany(
+        "INSERT INTO rollup_histogram (day, lens, variable, bucket, n) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (lens, variable, day, bucket) DO UPDATE SET n = n + excluded.n",
+        [(*key, n) for key, n in hist.items()],
+    )
+    conn.executemany(
+        "INSERT INTO rollup_levers (day, lens, qid, n) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (lens, day, qid) DO UPDATE SET n = n + excluded.n",
+        [(*key, n) for key, n in levers.items()],
+    )
+
+
+def rebuild_rollups(conn, chunk_size=10000):
+    """Drop and refold every stored run (e.g. for a store that predates rollups)."""
+    conn.execute("DELETE FROM rollup_variables")
+    conn.execute("DELETE FROM rollup_histogram")
+    conn.execute("DELETE FROM rollup_levers")
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, ts, lens, overall, zone, lever FROM runs WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk_size),
+        ).fetchall()
+        if not rows:
+            return
+        lo, hi = rows[0][0], rows[-1][0]
+        variables = defaultdict(list)
+        for run_id, v, pct, zone, vol in conn.execute(
+            "SELECT run_id, variable, pct, zone, volatility FROM run_variables WHERE run_id BETWEEN ? AND ?",
+            (lo, hi),
+        ):
+            variables[run_id].append((v, pct, zone, vol))
+        update_rollups(conn, [(ts, lens, overall, zone, lever, variables[run_id])
+                              for run_id, ts, lens, overall, zone, lever in rows])
+        last_id = hi
+
+
+# --------------------------
+# Query
+# --------------------------
+def _range(since_day, until_day):
+    sql, params = "", []
+    if since_day is not None:
+        sql += " AND day >= ?"
+        params.append(since_day)
+    if until_day is not None:
+        sql += " AND day <= ?"
+        params.append(until_day)
+    return sql, params
+
+
+def variable_summary(conn, lens, since_day=None, until_day=None):
+    """variable -> {n, mean, stdev, red, yellow, green} over the day range."""
+    sql, params = _range(since_day, until_day)
+    out = {}
+    for v, n, sum_pct, sum_sq, red, yellow, green in conn.execute(
+        "SELECT variable, SUM(n), SUM(sum_pct), SUM(sum_sq), SUM(red), SUM(yellow), SUM(green) "
+        f"FROM rollup_variables WHERE lens = ?{sql} GROUP BY variable",
+        (lens, *params),
+    ):
+        mean = sum_pct / n
+        out[v] = {
+            "n": n,
+            "mean": mean,
+            "stdev": max(0.0, sum_sq / n - mean * mean) ** 0.5,
+            "red": red,
+            "yellow": yellow,
+            "green": green,
+        }
+    return out
+
+
+def score_histogram(conn, lens, variable=OVERALL, since_day=None, until_day=None):
+    """Counts per BUCKET_WIDTH-wide pct bucket, N_BUCKETS long."""
+    sql, params = _range(since_day, until_day)
+    counts = [0] * N_BUCKETS
+    for bucket, n in conn.execute(
+        f"SELECT bucket, SUM(n) FROM rollup_histogram WHERE lens = ? AND variable = ?{sql} GROUP BY bucket",
+        (lens, variable, *params),
+    ):
+        counts[bucket] = n
+    return counts
+
+
+def top_levers(conn, lens, limit=10, since_day=None, until_day=None):
+    """[(qid, times flagged as Smallest lever)], most frequent first."""
+    sql, params = _range(since_day, until_day)
+    return [tuple(row) for row in conn.execute(
+        f"SELECT qid, SUM(n) AS total FROM rollup_levers WHERE lens = ?{sql} "
+        "GROUP BY qid ORDER BY total DESC, qid LIMIT ?",
+        (lens, *params, limit),
+    )]
@@ -0,0 +1,127 @@
+"""
+Run tokens — a whole run in ~35 URL-safe characters
+A token carries everything needed to restore or re-score a run without
+server-side storage: which bank (by version), the sampled question
+permutation, the 0..4 answers and where the respondent was.
+
+    byte 0     format << 4 | flags (adaptive, finished, partial)
+    bytes 1-4  first 8 hex digits of the bank version (implies the lens)
+    byte 5     slots in the run
+    byte 6     slots asked so far
+    byte 7     slot on screen
+    rest       one big-endian integer, mixed radix:
+               - the permutation as a Lehmer code (radix len(bank), len(bank)-1, ...)
+               - one digit per slot: the answer in base 5, or base 6 with
+                 5 = unanswered when the partial flag is set
+
+Slots are written in the order they were shown, so an adaptive run's
+asked slots come first and `asked` is just a count. Lehmer digits are
+worked out against the positions already used, O(n^2) in the run
+length whatever the bank size, so banks of any size fit. The payload length
+follows from the header, so any truncation or padding is rejected.
+base64url without padding; 25 answered questions encode in 35 chars.
+"""
+
+import base64
+
+from .bank import BANKS
+from .session import UNANSWERED, RunState
+
+FORMAT = 1
+ADAPTIVE, FINISHED, PARTIAL = 1, 2, 4
+HEADER = 8
+
+
+class TokenError(ValueError):
+    """A run token that cannot be decoded against the banks loaded here."""
+
+
+def _payload_len(n_bank, n, base):
+    span = 1
+    for i in range(n):
+        span *= n_bank - i
+    span *= base ** n
+    return max(1, ((span - 1).bit_length() + 7) // 8)
+
+
+def _bank_for(prefix):
+    for bank in BANKS.values():
+        if bank.version.startswith(prefix):
+            return bank
+    raise TokenError(f"no loaded bank has version {prefix}…")
+
+
+def encode_run(run: RunState, finished: bool = False) -> str:
+    bank = run.bank
+    n = len(run)
+    if n > 255:
+        raise TokenError("runs over 255 questions do not fit a token")
+    asked = list(run.asked)
+    seen = set(asked)
+    shown = asked + [s for s in range(n) if s not in seen]
+    answers = [run.answers[s] for s in shown]
+    partial = UNANSWERED in answers
+    base = 6 if partial else 5
+
+    value = 0
+    used = []
+    for i, s in enumerate(shown):
+        pos = run.order[s]
+        value = value * (len(bank) - i) + pos - sum(p < pos for p in used)  # rank among unused positions
+        used.append(pos)
+    for a in answers:
+        value = value * base + (5 if a == UNANSWERED else a)
+
+    flags = (ADAPTIVE if run.adaptive else 0) | (FINISHED if finished else 0) | (PARTIAL if partial else 0)
+    head = bytes((FORMAT << 4 | flags,)) + bytes.fromhex(bank.version[:8]) + bytes((n, len(asked), run.idx))
+    raw = head + value.to_bytes(_payload_len(len(bank), n, base), "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_run(token: str):
+    """(RunState, finished) for a token; TokenError if it is malformed or for an unknown bank."""
+    token = token.strip()
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise TokenError("not a run token") from None
+    if len(raw) <= HEADER or raw[0] >> 4 != FORMAT:
+        raise TokenError("not a run token")
+    flags = raw[0] & 0xF
+    bank = _bank_for(raw[1:5].hex())
+    n, n_asked, idx = raw[5], raw[6], raw[7]
+    base = 6 if flags & PARTIAL else 5
+    if not 0 < n <= len(bank) or n_asked > n or idx >= max(n_asked, 1):
+        raise TokenError("token header does not fit its bank")
+    if flags & ADAPTIVE and not flags & FINISHED and n_asked == 0:
+        raise TokenError("unfinished adaptive token has no question on screen")
+    if len(raw) - HEADER != _payload_len(len(bank), n, base):
+        raise TokenError("token is truncated or padded")
+
+    value = int.from_bytes(raw[HEADER:], "big")
+    answers = []
+    for _ in range(n):
+        value, a = divmod(value, base)
+        answers.append(UNANSWERED if a == 5 else a)
+    answers.reverse()
+    digits = []
+    for i in reversed(range(n)):
+        value, d = divmod(value, len(bank) - i)
+        digits.append(d)
+    if value:
+        raise TokenError("token payload out of range")
+    positions = []
+    for d in reversed(digits):
+        pos = d  # the d-th unused position
+        for p in sorted(positions):
+            if p <= pos:
+                pos += 1
+        positions.append(pos)
+
+    run = RunState(bank, positions, adaptive=bool(flags & ADAPTIVE))
+    for slot, a in enumerate(answers):
+        if a != UNANSWERED:
+            run.set_answer(slot, a)  # folds the preview aggregates as it goes
+    run.asked.extend(range(n_asked if run.adaptive else n))
+    run.idx = idx
+    return run, bool(flags & FINISHED)
@@ -0,0 +1,53 @@
+"""
+Sampling — k questions from a bank, stratified by variable
+Draws straight from CompiledLens.by_variable (bank positions grouped
+per variable, built once at compile time), so a draw never copies or
+shuffles the bank: each variable's share is one random.sample over its
+positions, O(quota) whatever the bank size, and the picks are shuffled
+together at the end (O(k)).
+
+Quotas follow each variable's share of the bank (largest remainder),
+with at least one question per variable whenever k allows, and are
+worked out once per bank edition and k. Pass a seed (or a
+random.Random) to reproduce a draw.
+"""
+
+import random
+
+_quotas = {}  # (lens, version, k) -> ((variable, quota), ...)
+
+
+def quotas(bank, k):
+    """((variable, n), ...) summing to min(k, len(bank)); every variable gets one when k >= their count."""
+    key = (bank.lens, bank.version, k)
+    hit = _quotas.get(key)
+    if hit is not None:
+        return hit
+    k = min(k, len(bank))
+    sizes = {v: len(pos) for v, pos in bank.by_variable.items()}
+    out = dict.fromkeys(sizes, 1 if k >= len(sizes) else 0)
+    spare = {v: sizes[v] - out[v] for v in sizes}
+    rest, total = k - sum(out.values()), sum(spare.values())
+    share = {v: rest * spare[v] / total if total else 0.0 for v in sizes}
+    for v in sizes:
+        out[v] += int(share[v])
+    # what rounding left over goes to the largest remainders (never past a variable's size)
+    left = k - sum(out.values())
+    for v in sorted(sizes, key=lambda v: share[v] - int(share[v]), reverse=True)[:left]:
+        out[v] += 1
+    hit = _quotas[key] = tuple(out.items())
+    return hit
+
+
+def sample_positions(bank, k, seed=None):
+    """
+    k bank positions (fewer if the bank is smaller), stratified by
+    variable, in random order. seed: int or random.Random for a
+    reproducible draw; the module's generator otherwise.
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed) if seed is not None else random
+    picks = []
+    for v, n in quotas(bank, k):
+        picks += rng.sample(bank.by_variable[v], n)
+    rng.shuffle(picks)
+    return picks
@@ -0,0 +1,130 @@
+"""
+Scoring config — versioned, so every stored score says what produced it
+A ScoringConfig is everything compute_scores depends on besides the
+answers: VARIABLE_WEIGHTS, the zone cuts and each lens's per-question
+variable, weight and reverse flag. Its version is a short content
+hash, like bank.bank_version. current_config() is the config this code
+scores with; RunStore registers it (scoring_configs) and stamps each
+run's config_version, so a later edition can tell which runs to
+re-score and diff() can say which lenses and variables actually moved
+(backfill.py).
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+
+from .bank import BANKS
+from .scoring import VARIABLE_WEIGHTS, ZONES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scoring_configs (
+    version TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    config TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class LensChange:
+    """What re-scoring a lens under a new config rewrites."""
+    variables: frozenset   # variables whose pct (and zone, volatility) move
+    overall: bool          # the overall score moves
+    zones: bool            # zone cuts moved: every zone is re-derived
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    variable_weights: MappingProxyType   # variable -> weight
+    zone_cuts: tuple                     # (YELLOW from, GREEN from)
+    items: MappingProxyType              # lens -> {qid: (variable, weight, reverse)}
+
+    @cached_property
+    def version(self) -> str:
+        return hashlib.sha1(self.to_json().encode("utf-8")).hexdigest()[:12]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "variable_weights": dict(self.variable_weights),
+                "zone_cuts": list(self.zone_cuts),
+                "items": {lens: {qid: list(item) for qid, item in items.items()} for lens, items in self.items.items()},
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "ScoringConfig":
+        raw = json.loads(text)
+        return cls(
+            MappingProxyType(raw["variable_weights"]),
+            tuple(raw["zone_cuts"]),
+            MappingProxyType({
+                lens: MappingProxyType({qid: (v, float(w), bool(r)) for qid, (v, w, r) in items.items()})
+                for lens, items in raw["items"].items()
+            }),
+        )
+
+    def diff(self, new: "ScoringConfig") -> dict:
+        """lens -> LensChange for every lens of `new` whose stored scores would change."""
+        zones = tuple(self.zone_cuts) != tuple(new.zone_cuts)
+        moved_weights = {
+            v for v in set(self.variable_weights) | set(new.variable_weights)
+            if self.variable_weights.get(v, 1.0) != new.variable_weights.get(v, 1.0)
+        }
+        out = {}
+        for lens, items in new.items.items():
+            old = self.items.get(lens, {})
+            variables = frozenset(
+                item[0]
+                for qid in set(old) | set(items)
+                if old.get(qid) != items.get(qid)
+                for item in (old.get(qid), items.get(qid))
+                if item is not None
+            )
+            present = {item[0] for item in items.values()}
+            overall = bool(variables) or bool(moved_weights & present)
+            if overall or zones:
+                out[lens] = LensChange(variables, overall, zones)
+        return out
+
+
+def config_from(variable_weights, zones, banks) -> ScoringConfig:
+    return ScoringConfig(
+        MappingProxyType({v: float(w) for v, w in variable_weights.items()}),
+        (float(zones["YELLOW"][0]), float(zones["GREEN"][0])),
+        MappingProxyType({
+            lens: MappingProxyType({
+                qid: (bank.variable(pos), bank.weights[pos], bank.is_reverse(pos))
+                for pos, qid in enumerate(bank.ids)
+            })
+            for lens, bank in banks.items()
+        }),
+    )
+
+
+@lru_cache(maxsize=1)
+def current_config() -> ScoringConfig:
+    """The config compute_scores uses in this process."""
+    return config_from(VARIABLE_WEIGHTS, ZONES, BANKS)
+
+
+# --------------------------
+# Registry
+# --------------------------
+def register(conn, config: ScoringConfig, created: float):
+    conn.execute(
+        "INSERT OR IGNORE INTO scoring_configs (version, created, config) VALUES (?, ?, ?)",
+        (config.version, created, config.to_json()),
+    )
+
+def load_config(conn, version):
+    """A registered ScoringConfig, or None (unknown version, or runs stored before versioning)."""
+    if version is None:
+        return None
+    row = conn.execute("SELECT config FROM scoring_configs WHERE version = ?", (version,)).fetchone()
+    return ScoringConfig.from_json(row[0]) if row is not None else None
@@ -0,0 +1,164 @@
+"""
+Scoring — single respondent
+Same math across lenses: answers 0..4, reverse items flipped,
+weighted per variable, then VARIABLE_WEIGHTS across variables.
+"""
+
+from . import metrics
+
+# --------------------------
+# Universal Variables (shared)
+# --------------------------
+VARIABLE_WEIGHTS = {
+    "Baseline": 1.2,
+    "Clarity": 1.1,
+    "Resources": 1.1,
+    "Boundaries": 1.1,
+    "Execution": 1.2,
+    "Feedback": 1.0,
+}
+
+ZONES = {
+    "RED": (0, 44.999),
+    "YELLOW": (45, 69.999),
+    "GREEN": (70, 100),
+}
+
+def zone_name(score_0_100: float) -> str:
+    # the same cuts scoreconfig records and BatchScorer/backfill apply: where YELLOW and GREEN start
+    if score_0_100 < ZONES["YELLOW"][0]:
+        return "RED"
+    if score_0_100 < ZONES["GREEN"][0]:
+        return "YELLOW"
+    return "GREEN"
+
+def clamp(n, lo, hi):
+    return max(lo, min(hi, n))
+
+# --------------------------
+# Scoring
+# --------------------------
+@metrics.timed("compute_scores")
+def compute_scores(questions, answers, bank=None):
+    """
+    answers: dict[qid] -> int (0..4)
+    bank: optional CompiledLens the questions come from; weight/reverse
+          are then read from its arrays instead of each question dict
+    returns: overall, per_variable dict with details
+    """
+    # collect per variable item scores in 0..4
+    per_var_items = {}
+    per_var_weights = {}
+    per_var_raw_scores = {}  # for volatility
+
+    # also keep a per-question scored list for "dominant distortions"
+    scored_qs = []  # (variable, scored_0_4, weight, qdict, answer)
+
+    for q in questions:
+        qid = q["id"]
+        if qid not in answers:
+            continue
+        a = int(answers[qid])
+        v = q["variable"]
+        if bank is None:
+            s = (4 - a) if q.get("reverse", False) else a  # 0..4 higher is better
+            w = float(q.get("weight", 1.0))
+        else:
+            pos = bank.index[qid]
+            s = (4 - a) if bank.is_reverse(pos) else a
+            w = bank.weights[pos]
+
+        per_var_items.setdefault(v, 0.0)
+        per_var_weights.setdefault(v, 0.0)
+        per_var_raw_scores.setdefault(v, [])
+
+        per_var_items[v] += s * w
+        per_var_weights[v] += w
+        per_var_raw_scores[v].append(s)
+
+        scored_qs.append((v, s, w, q, a))
+
+    per_variable = {}
+    for v, num in per_var_items.items():
+        den = per_var_weights[v] if per_var_weights[v] else 1.0
+        mean_0_4 = num / den
+        pct = (mean_0_4 / 4.0) * 100.0
+
+        # volatility: stdev of the 0..4 scores, scaled to 0..100
+        raw_list = per_var_raw_scores.get(v, [])
+        vol = 0.0
+        if len(raw_list) >= 2:
+            from statistics import pstdev  # deferred: statistics costs ~10 ms to import
+            vol = (pstdev(raw_list) / 2.0) * 100.0
+        vol = clamp(vol, 0, 100)
+
+        per_variable[v] = {
+            "mean_0_4": mean_0_4,
+            "pct": pct,
+            "zone": zone_name(pct),
+            "volatility": vol,
+        }
+
+    # overall weighted by VARIABLE_WEIGHTS (only variables present)
+    overall_num = 0.0
+    overall_den = 0.0
+    for v, info in per_variable.items():
+        vw = float(VARIABLE_WEIGHTS.get(v, 1.0))
+        overall_num += info["pct"] * vw
+        overall_den += vw
+    overall = (overall_num / overall_den) if overall_den else 0.0
+
+    # Dominant distortions: lowest scored questions (after reverse handling)
+    # We care about low "s" and high weight
+    scored_qs_sorted = sorted(scored_qs, key=lambda t: (t[1], -t[2]))  # low score first, heavier weight first
+
+    return overall, per_variable, scored_qs_sorted
+
+# --------------------------
+# Readout picks (shared by the results page and offline scoring)
+# --------------------------
+def weakest_and_strongest(per_variable):
+    """(lowest, highest) variable by pct, or (None, None) if nothing was scored."""
+    vars_present_sorted = sorted(per_variable, key=lambda v: per_variable[v]["pct"])
+    if not vars_present_sorted:
+        return None, None
+    return vars_present_sorted[0], vars_present_sorted[-1]
+
+def smallest_lever(scored_qs_sorted, variable):
+    """Most leveraged low question inside `variable`: lowest score, then highest weight."""
+    low_var_items = [t for t in scored_qs_sorted if t[0] == variable]
+    if not low_var_items:
+        return None
+    return sorted(low_var_items, key=lambda t: (t[1], -t[2]))[0]
+
+def weakest_lever(per_variable, scored_qs_sorted):
+    """The Smallest lever of the lowest variable, or None if nothing was scored."""
+    lowest, _ = weakest_and_strongest(per_variable)
+    return smallest_lever(scored_qs_sorted, lowest) if lowest is not None else None
+
+def next_focus_targets(per_variable, lowest, limit=3):
+    # A simple next-path recommendation: drill into lowest variable + any other RED
+    reds = [v for v in per_variable if per_variable[v]["zone"] == "RED"]
+    yellows = [v for v in per_variable if per_variable[v]["zone"] == "YELLOW"]
+    next_targets = []
+    if lowest not in next_targets:
+        next_targets.append(lowest)
+    for v in reds:
+        if v not in next_targets:
+            next_targets.append(v)
+    if len(next_targets) < 2:
+        for v in yellows:
+            if v not in next_targets:
+                next_targets.append(v)
+            if len(next_targets) >= 2:
+                break
+    return next_targets[:limit]
+
+def export_record(lens, overall, per_variable, answers):
+    """The results page's "Export (copy/paste)" block."""
+    return {
+        "lens": lens,
+        "overall": round(overall, 2),
+        "variables": {v: round(per_variable[v]["pct"], 2) for v in per_variable},
+        "answers": answers,
+    }
@@ -0,0 +1,174 @@
+"""
+Sensitivity — what a one-point improvement on each item is worth
+Closed form, vectorized over every answered item of every run at once.
+Raising item i's scored value s_i by one (while s_i < 4) moves its
+variable v by 25 * w_i / W_v pct points (W_v: weight answered in v) and
+the overall score by that times VARIABLE_WEIGHTS[v] / (sum of the
+weights of the variables present). flip_steps is how many such steps
+on item i alone lift v into the next zone; inf when its headroom
+(4 - s_i) is not enough or v is already GREEN. W_v and the weight
+total are added up in the scorer's own order, and counts that land on
+a cut are re-summed that way too, so one run ranks the same whether it
+comes through rank_levers or a batch.
+
+Levers rank by fewest flip steps, then largest overall gain, then the
+old key (lowest score, heaviest weight), then question order. Cost is
+a few (N, Q) passes, a cumsum per variable and one lexsort: about 1 ms
+for one run over a 5000-item bank, 5 ms for 1000 stored 25-item runs.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .scoring import VARIABLE_WEIGHTS, ZONES
+
+ZONE_CUTS = (ZONES["YELLOW"][0], ZONES["GREEN"][0])
+_NEAR = 1e-7  # a candidate pct this close to its cut is settled by the exact re-sum
+
+
+@dataclass(frozen=True)
+class LeverScores:
+    """
+    Arrays are [run, item]. Items that are unanswered or already at 4
+    have zero gain, infinite flip_steps and sit at the tail of ranked
+    as -1.
+    """
+    var_gain: np.ndarray     # pct points on the item's own variable per +1
+    gain: np.ndarray         # overall points per +1
+    flip_steps: np.ndarray   # +1 steps on this item alone to reach the next zone
+    ranked: np.ndarray       # item columns, best lever first
+
+
+def lever_scores(s, answered, weights, var_of, var_weights, pct=None, zone_cuts=ZONE_CUTS, ranks=None):
+    """
+    s: (N, Q) scored values 0..4 (reverse items already flipped)
+    answered: (N, Q) bool
+    weights: (Q,) item weights; var_of: (Q,) variable index of each item
+    var_weights: (V,) VARIABLE_WEIGHTS per variable index
+    pct: optional (N, V) variable pcts as scored (compute_scores or
+         BatchScores.pct), so a variable sitting on a cut is in the same
+         zone the readout shows; recomputed here when None
+
+    ranks: optional (N, Q) order the scorer summed each row's columns in
+    (BatchScorer.rank_matrix); column order when None. A step count
+    that lands within _NEAR of a cut is settled by redoing that sum in
+    the same order, and ties between levers go to the earlier question.
+    """
+    s = np.atleast_2d(np.asarray(s, dtype=np.float64))
+    answered = np.atleast_2d(np.asarray(answered, dtype=bool))
+    weights = np.asarray(weights, dtype=np.float64)
+    var_of = np.asarray(var_of, dtype=np.intp)
+    var_weights = np.asarray(var_weights, dtype=np.float64)
+    cuts = np.asarray(zone_cuts, dtype=np.float64)
+    n_q = s.shape[1]
+    ordered = ranks is None  # columns already in summing order
+    ranks = np.broadcast_to(np.arange(n_q), s.shape) if ordered else np.atleast_2d(ranks)
+
+    n_rows, n_vars = len(s), len(var_weights)
+    w = np.where(answered, weights, 0.0)
+    num = np.zeros((n_rows, n_vars))
+    den = np.zeros((n_rows, n_vars))
+    never = 2 * n_q  # past every rank
+    first_seen = np.full((n_rows, n_vars), never)
+    for vi in range(n_vars):
+        cols = np.flatnonzero(var_of == vi)
+        if not len(cols):
+            continue
+        rank = ranks[:, cols]
+        terms, wts = s[:, cols] * w[:, cols], w[:, cols]
+        if not ordered:
+            perm = np.argsort(rank, axis=1, kind="stable")
+            terms, wts = np.take_along_axis(terms, perm, axis=1), np.take_along_axis(wts, perm, axis=1)
+        num[:, vi] = np.cumsum(terms, axis=1)[:, -1]
+        den[:, vi] = np.cumsum(wts, axis=1)[:, -1]
+        first_seen[:, vi] = np.where(answered[:, cols], rank, never).min(axis=1)
+    # variables in the order they first appear, as compute_scores adds them
+    vw_total = np.zeros(n_rows)
+    rows_all = np.arange(n_rows)
+    for vi in np.argsort(first_seen, axis=1, kind="stable").T:
+        vw_total = vw_total + np.where(den[rows_all, vi] > 0, var_weights[vi], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if pct is None:
+            pct = 25.0 * num / den
+        pct = np.atleast_2d(np.asarray(pct, dtype=np.float64))
+
+        headroom = np.where(answered, 4.0 - s, 0.0)
+        var_gain = np.where(headroom > 0, 25.0 * w / den[:, var_of], 0.0)
+        gain = np.where(var_gain > 0, var_gain * var_weights[var_of] / vw_total[:, None], 0.0)
+
+        # the next cut up from each variable (inf once GREEN), and a first guess at the steps to it
+        nxt = np.searchsorted(cuts, np.nan_to_num(pct, nan=np.inf), side="right")
+        cut = np.append(cuts, np.inf)[nxt][:, var_of]
+        steps = np.maximum(np.ceil((cut - pct[:, var_of]) / var_gain), 1.0)
+
+        # settle the guess with the scorer's own arithmetic, so rounding
+        # near a cut cannot disagree with the zone the readout will show
+        num_q, den_q = num[:, var_of], den[:, var_of]
+        live = (var_gain > 0) & np.isfinite(cut) & (steps <= headroom + 1)
+
+        def reaches(k):
+            after = ((num_q + k * w) / den_q / 4.0) * 100.0
+            out = after >= cut
+            rows, items = np.nonzero(live & (np.abs(after - cut) < _NEAR))
+            for vi in np.unique(var_of[items]).tolist():  # re-sum each variable's columns in rank order
+                r, j = rows[var_of[items] == vi], items[var_of[items] == vi]
+                cols = np.flatnonzero(var_of == vi)
+                mask = answered[np.ix_(r, cols)]
+                terms = np.where(mask, s[np.ix_(r, cols)] * weights[cols], 0.0)
+                terms = np.where(cols == j[:, None], ((s[r, j] + k[r, j]) * weights[j])[:, None], terms)
+                wts = np.where(mask, weights[cols], 0.0)
+                perm = np.argsort(ranks[np.ix_(r, cols)], axis=1, kind="stable")
+                exact_num = np.cumsum(np.take_along_axis(terms, perm, axis=1), axis=1)[:, -1]
+                exact_den = np.cumsum(np.take_along_axis(wts, perm, axis=1), axis=1)[:, -1]
+                out[r, j] = ((exact_num / exact_den) / 4.0) * 100.0 >= cut[r, j]
+            return out
+
+        steps = np.where(reaches(steps), steps, steps + 1)
+        steps = np.where((steps > 1) & reaches(steps - 1), steps - 1, steps)
+    flip_steps = np.where(live & (steps <= headroom), steps, np.inf)
+
+    order = np.lexsort(
+        (ranks, np.broadcast_to(-weights, s.shape), s, -gain, flip_steps, var_gain <= 0), axis=-1
+    )
+    ranked = np.where(np.take_along_axis(var_gain > 0, order, axis=1), order, -1)
+    return LeverScores(var_gain=var_gain, gain=gain, flip_steps=flip_steps, ranked=ranked)
+
+
+def rank_levers(scored_qs, per_variable=None, variable_weights=None, order=None):
+    """
+    One run's compute_scores items, best lever first, as
+    [(item, gain, var_gain, flip_steps)]; flip_steps is None when out of
+    reach. Items already at 4 are left out. per_variable: the same
+    run's compute_scores output, for its exact pcts. order: the qids in
+    the order compute_scores was given them, so flip steps on a cut
+    are checked with its own sums.
+    """
+    variable_weights = VARIABLE_WEIGHTS if variable_weights is None else variable_weights
+    if not scored_qs:
+        return []
+    if order is not None:
+        rank = {qid: i for i, qid in enumerate(order)}
+        scored_qs = sorted(scored_qs, key=lambda t: rank.get(t[3]["id"], len(rank)))
+    variables = list(dict.fromkeys(t[0] for t in scored_qs))
+    pos = {v: i for i, v in enumerate(variables)}
+    scores = lever_scores(
+        [t[1] for t in scored_qs],
+        np.ones(len(scored_qs), dtype=bool),
+        [t[2] for t in scored_qs],
+        [pos[t[0]] for t in scored_qs],
+        [float(variable_weights.get(v, 1.0)) for v in variables],
+        pct=[[per_variable[v]["pct"] for v in variables]] if per_variable is not None else None,
+    )
+    out = []
+    for j in scores.ranked[0].tolist():
+        if j < 0:
+            break
+        steps = scores.flip_steps[0, j]
+        out.append((
+            scored_qs[j],
+            float(scores.gain[0, j]),
+            float(scores.var_gain[0, j]),
+            int(steps) if np.isfinite(steps) else None,
+        ))
+    return out
@@ -0,0 +1,289 @@
+"""
+Scoring service — python -m src.service [--port 8765]
+A small asyncio HTTP/JSON server (standard library only) for tools that
+need scores without the UI:
+
+    POST /score           {"lens", "answers"[, "q_order"]}   -> one readout record
+                          or {"token"}
+    POST /score/batch     {"runs": [{...}, ...]}             -> {"results": [...]}
+    GET  /banks                                              -> lenses + bank versions
+    GET  /banks/<lens>                                       -> questions, ETag = bank version
+    GET  /stats                                              -> request / batch counters
+
+Concurrent POST /score requests are gathered into micro-batches (up to
+--max-batch runs or --max-delay seconds) and scored in one vectorized
+BatchScorer pass per lens, in a single scoring thread so the event loop
+keeps accepting while a batch runs. Records are the same as the CLI's
+(cli.readout_record), each run scored in the same question order
+cli.score_record uses (cli.run_order).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from .bank import BANKS
+from .cli import checked_run, readout_record, run_order, score_record
+
+MAX_BODY = 8 * 1024 * 1024
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+# --------------------------
+# Vectorized scoring
+# --------------------------
+_scorers = {}
+
+def _scorer(bank, BatchScorer):
+    scorer = _scorers.get(bank.lens)
+    if scorer is None or scorer.ids != bank.ids:
+        scorer = _scorers[bank.lens] = BatchScorer.from_bank(bank)
+    return scorer
+
+def score_batch(records):
+    """(record or None, error or None) per input, one BatchScorer pass per lens."""
+    try:
+        from .batch import BatchScorer
+    except ImportError:  # no NumPy: score_record one at a time
+        return [_score_one(r) for r in records]
+
+    results = [None] * len(records)
+    by_lens = {}
+    for i, record in enumerate(records):
+        try:
+            bank, answers = checked_run(record)
+            order = run_order(record, bank, answers)
+        except (ValueError, TypeError, AttributeError) as e:
+            results[i] = (None, str(e))
+            continue
+        by_lens.setdefault(bank.lens, []).append((i, answers, order))
+
+    for lens, items in by_lens.items():
+        bank = BANKS[lens]
+        scorer = _scorer(bank, BatchScorer)
+        matrix = scorer.answer_matrix(answers for _, answers, _ in items)
+        ranks = scorer.rank_matrix(order for _, _, order in items)
+        scores = scorer.score(matrix, ranks)
+        levers = scorer.levers(matrix, scores, ranks).ranked[:, 0].tolist()
+        for row, (i, answers, _) in enumerate(items):
+            overall, per_variable = scores.row(row)
+            scored_qs_sorted = []
+            for j in scores.ranked[row].tolist():
+                if j < 0:
+                    break
+                a = int(matrix[row, j])
+                s = (4 - a) if bank.is_reverse(j) else a
+                q = bank.question(j)
+                scored_qs_sorted.append((q["variable"], s, bank.weights[j], q, a))
+            lever = bank.ids[levers[row]] if levers[row] >= 0 else None
+            results[i] = (readout_record(lens, answers, overall, per_variable, scored_qs_sorted, lever), None)
+    return results
+
+def _score_one(record):
+    try:
+        return score_record({k: record.get(k) for k in ("lens", "answers", "token", "q_order")}), None
+    except (ValueError, TypeError, AttributeError) as e:
+        return None, str(e)
+
+
+class MicroBatcher:
+    """Gathers concurrent submit() calls into one score_batch() call."""
+
+    def __init__(self, max_batch=256, max_delay=0.002):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="score")
+        self.batches = 0
+        self.batched_runs = 0
+
+    async def submit(self, record):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((record, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await fut
+
+    async def run(self, records):
+        """Score a caller-supplied batch directly (POST /score/batch)."""
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.batched_runs += len(records)
+        return await loop.run_in_executor(self._executor, score_batch, records)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._resolve(batch))
+
+    async def _resolve(self, batch):
+        try:
+            results = await self.run([record for record, _ in batch])
+        except Exception as e:  # noqa: BLE001 - hand the failure to every waiter
+            results = [(None, f"scoring failed: {e}")] * len(batch)
+        for (_, fut), (out, error) in zip(batch, results):
+            if fut.done():
+                continue
+            if error is None:
+                fut.set_result(out)
+            else:
+                fut.set_exception(ValueError(error))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+# --------------------------
+# HTTP
+# --------------------------
+def _bank_payload(bank):
+    return {
+        "lens": bank.lens,
+        "version": bank.version,
+        "questions": [
+            {"id": q["id"], "text": q["text"], "variable": q["variable"]}
+            for q in bank.questions
+        ],
+    }
+
+class ScoringService:
+    def __init__(self, max_batch=256, max_delay=0.002):
+        self.batcher = MicroBatcher(max_batch, max_delay)
+        self.requests = 0
+        # bank bodies never change for a given version; encode them once
+        self._banks = {
+            lens: (json.dumps(_bank_payload(bank), ensure_ascii=False).encode("utf-8"), f'"{bank.version}"')
+            for lens, bank in BANKS.items()
+        }
+
+    async def route(self, method, path, headers, body):
+        """(status, payload bytes or JSON-able, extra headers)."""
+        if path == "/score" or path == "/score/batch":
+            if method != "POST":
+                return 405, {"error": "use POST"}, {}
+            try:
+                data = json.loads(body or b"null")
+            except ValueError as e:
+                return 400, {"error": f"invalid JSON: {e}"}, {}
+            if path == "/score":
+                if not isinstance(data, dict):
+                    return 400, {"error": "expected an object with lens and answers, or a token"}, {}
+                try:
+                    return 200, await self.batcher.submit(data), {}
+                except ValueError as e:
+                    return 400, {"error": str(e)}, {}
+            runs = data.get("runs") if isinstance(data, dict) else data
+            if not isinstance(runs, list) or not all(isinstance(r, dict) for r in runs):
+                return 400, {"error": "expected {\"runs\": [{lens, answers}, ...]}"}, {}
+            results = await self.batcher.run(runs)
+            return 200, {"results": [out if err is None else {"error": err} for out, err in results]}, {}
+
+        if method != "GET":
+            return 405, {"error": "use GET"}, {}
+        if path == "/banks":
+            return 200, {"lenses": {lens: bank.version for lens, bank in BANKS.items()}}, {}
+        if path.startswith("/banks/"):
+            cached = self._banks.get(unquote(path[len("/banks/"):]))
+            if cached is None:
+                return 404, {"error": "unknown lens"}, {}
+            payload, etag = cached
+            extra = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag in headers.get("if-none-match", ""):
+                return 304, b"", extra
+            return 200, payload, extra
+        if path == "/stats":
+            b = self.batcher
+            return 200, {
+                "requests": self.requests,
+                "batches": b.batches,
+                "batched_runs": b.batched_runs,
+                "mean_batch": (b.batched_runs / b.batches) if b.batches else 0.0,
+            }, {}
+        return 404, {"error": "not found"}, {}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+
+                raw_length = headers.get("content-length") or "0"
+                length = int(raw_length) if raw_length.isascii() and raw_length.isdigit() else -1
+                if length < 0:  # the body cannot be framed, so the connection closes after the reply
+                    status, payload, extra = 400, {"error": "invalid Content-Length"}, {}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, payload, extra = 413, {"error": "body too large"}, {}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    self.requests += 1
+                    status, payload, extra = await self.route(method, urlsplit(target).path, headers, body)
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                if not isinstance(payload, bytes):
+                    payload = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                        "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(payload)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        addr = server.sockets[0].getsockname()
+        print(f"scoring service on http://{addr[0]}:{addr[1]}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.batcher.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.service")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address (default loopback)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256, help="runs per micro-batch")
+    parser.add_argument("--max-delay", type=float, default=0.002, help="seconds to wait for a batch to fill")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(ScoringService(args.max_batch, args.max_delay).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
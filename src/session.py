@@ -0,0 +1,149 @@
+"""
+Session state — one run in progress, packed
+A run is a reference into the shared, immutable compiled bank (lens +
+bank version) and a few small integer arrays:
+
+- order:   bank positions asked this run, in run order (the "slots")
+- answers: one byte per slot, 0..4 or UNANSWERED
+- asked:   slots in the order they were shown (adaptive runs grow it)
+- agg:     the live preview's per-variable aggregates (incremental.py),
+           STRIDE doubles per variable, updated O(1) by set_answer
+
+Question dicts, ids and texts are never copied into the session; they
+are read from BANKS by position. The adaptive selector is rebuilt from
+these arrays when needed, so it does not live in session state.
+session_bytes() reports what a session holds on top of the shared banks
+and lens tables.
+"""
+
+import sys
+from array import array
+from types import FunctionType, MappingProxyType, ModuleType
+
+from .adaptive import AdaptiveSelector
+from .bank import BANKS
+from . import incremental
+from .lenses import READOUT_INTROS, TRANSLATIONS
+
+UNANSWERED = 0xFF
+
+
+def _typecode(n):
+    """Smallest unsigned array typecode that holds 0..n-1."""
+    return "B" if n <= 1 << 8 else "H" if n <= 1 << 16 else "I"
+
+
+class RunState:
+    __slots__ = ("lens", "version", "order", "answers", "asked", "idx", "adaptive", "agg")
+
+    def __init__(self, bank, positions, adaptive=False):
+        self.lens = bank.lens
+        self.version = bank.version
+        self.order = array(_typecode(len(bank)), positions)
+        self.answers = bytearray([UNANSWERED]) * len(self.order)
+        self.asked = array(_typecode(len(self.order)))
+        self.idx = 0
+        self.adaptive = adaptive
+        self.agg = incremental.new_aggregates(len(bank.variables))
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def bank(self):
+        bank = BANKS[self.lens]
+        if bank.version != self.version:
+            raise LookupError(f"{self.lens}: bank changed from {self.version} to {bank.version} mid-run")
+        return bank
+
+    # --------------------------
+    # Questions
+    # --------------------------
+    def question(self, slot: int) -> dict:
+        return self.bank.question(self.order[slot])
+
+    def questions(self) -> list:
+        bank = self.bank
+        return [bank.question(pos) for pos in self.order]
+
+    @property
+    def slot(self) -> int:
+        """The slot on screen now."""
+        return self.asked[self.idx]
+
+    # --------------------------
+    # Answers
+    # --------------------------
+    def answer(self, slot: int):
+        a = self.answers[slot]
+        return None if a == UNANSWERED else a
+
+    def set_answer(self, slot: int, answer: int):
+        if not 0 <= answer <= 4:
+            raise ValueError(f"answer must be 0..4, got {answer!r}")
+        old = self.answers[slot]
+        if old == answer:
+            return
+        bank, pos = self.bank, self.order[slot]
+        if old != UNANSWERED:
+            incremental.fold(self.agg, bank, pos, old, -1)
+        incremental.fold(self.agg, bank, pos, answer)
+        self.answers[slot] = answer
+
+    def answered(self) -> int:
+        return len(self.answers) - self.answers.count(UNANSWERED)
+
+    def answer_dict(self) -> dict:
+        """qid -> answer for the answered slots, in run order (compute_scores, store, export)."""
+        ids = self.bank.ids
+        return {ids[pos]: a for pos, a in zip(self.order, self.answers) if a != UNANSWERED}
+
+    def preview(self):
+        """Live (overall, zone, per_variable) from the answers so far; no rescan."""
+        return incremental.preview(self.agg, self.bank.variables)
+
+    def selector(self):
+        """AdaptiveSelector over this run's slots, or None for a fixed-length run."""
+        return AdaptiveSelector(self.questions()) if self.adaptive else None
+
+
+# --------------------------
+# Footprint
+# --------------------------
+_shared = None
+
+def _shared_ids():
+    # everything reachable from the compiled banks and lens tables is shared by every session
+    global _shared
+    if _shared is None:
+        _shared = set()
+        _walk((BANKS, TRANSLATIONS, READOUT_INTROS), _shared, sizes=False)
+    return _shared
+
+def _walk(obj, seen, sizes=True):
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or o is None or isinstance(o, (bool, type, ModuleType, FunctionType)):
+            continue
+        if type(o) is int and -5 <= o <= 256:
+            continue  # cached small ints
+        seen.add(id(o))
+        if sizes:
+            total += sys.getsizeof(o)
+        if isinstance(o, (dict, MappingProxyType)):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, "__dict__"):
+            stack.extend(vars(o).values())
+        else:
+            stack.extend(getattr(o, name) for name in getattr(type(o), "__slots__", ()) if hasattr(o, name))
+    return total
+
+def session_bytes(state) -> int:
+    """Deep size of a session-state mapping, not counting the shared banks and lens tables."""
+    seen = set(_shared_ids())
+    return sum(_walk(k, seen) + _walk(v, seen) for k, v in state.items())
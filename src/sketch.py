@@ -0,0 +1,157 @@
+"""
+Quantile sketch — KLL, mergeable, a few KB whatever the population
+Items are kept in levels of "compactors": level h holds items that each
+stand for 2**h originals. When the sketch outgrows its budget, the first
+full level is sorted and every other item (random offset) is promoted
+one level up, so the total weight stays exactly n. Level capacities
+shrink geometrically (k, 2k/3, 4k/9, ...) from the top, which bounds the
+sketch at about 3k items and rank error at roughly 1.7/k.
+
+Two sketches merge by concatenating levels and compacting, so partial
+sketches from different processes or stores combine into the same
+answer as one sketch over everything. to_bytes()/from_bytes() give a
+compact blob for storage. rank() answers from a sorted, cumulative view
+built once per change, so lookups are a bisect.
+"""
+
+import math
+import random
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+DEFAULT_K = 200
+SHRINK = 2.0 / 3.0
+FORMAT = 1
+_HEAD = struct.Struct("<BHQddB")   # format, k, n, min, max, levels
+_LEVEL = struct.Struct("<I")       # items in the level
+
+_rng = random.Random()
+
+
+class QuantileSketch:
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [[]]
+        self._size = 0
+        self._view = None   # (sorted values, cumulative weights)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, h):
+        return max(2, math.ceil(self.k * SHRINK ** (len(self.levels) - h - 1)))
+
+    def _compress(self):
+        while self._size >= sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, level in enumerate(self.levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                level.sort()
+                keep = [level.pop()] if len(level) % 2 else []
+                promoted = level[_rng.getrandbits(1)::2]
+                self.levels[h + 1].extend(promoted)
+                self._size -= len(level) - len(promoted)
+                level[:] = keep
+                break
+
+    # --------------------------
+    # Update
+    # --------------------------
+    def add(self, x):
+        x = float(x)
+        self.levels[0].append(x)
+        self.n += 1
+        self._size += 1
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self._view = None
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def extend(self, xs):
+        for x in xs:
+            self.add(x)
+
+    def merge(self, other):
+        """Fold `other` into this sketch (other is left unchanged)."""
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+            self._size += len(level)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._view = None
+        self._compress()
+        return self
+
+    # --------------------------
+    # Query
+    # --------------------------
+    def view(self):
+        if self._view is None:
+            items = sorted((x, 1 << h) for h, level in enumerate(self.levels) for x in level)
+            self._view = ([x for x, _ in items], list(accumulate(w for _, w in items)))
+        return self._view
+
+    def rank(self, x):
+        """Share of the population below x, counting ties as half (0..1); nan when empty."""
+        values, cum = self.view()
+        if not values:
+            return math.nan
+        lo = bisect_left(values, x)
+        hi = bisect_right(values, x, lo)
+        below = cum[lo - 1] if lo else 0
+        through = cum[hi - 1] if hi else 0
+        return (below + through) / (2.0 * cum[-1])
+
+    def quantile(self, q):
+        values, cum = self.view()
+        if not values:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        return values[min(len(values) - 1, bisect_left(cum, q * cum[-1]))]
+
+    # --------------------------
+    # Storage
+    # --------------------------
+    def to_bytes(self) -> bytes:
+        parts = [_HEAD.pack(FORMAT, self.k, self.n, self.min, self.max, len(self.levels))]
+        for level in self.levels:
+            parts.append(_LEVEL.pack(len(level)))
+            parts.append(array("d", level).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "QuantileSketch":
+        fmt, k, n, lo, hi, n_levels = _HEAD.unpack_from(blob)
+        if fmt != FORMAT:
+            raise ValueError(f"unknown sketch format {fmt}")
+        sketch = cls(k)
+        sketch.n, sketch.min, sketch.max = n, lo, hi
+        sketch.levels = []
+        offset = _HEAD.size
+        for _ in range(n_levels):
+            (count,) = _LEVEL.unpack_from(blob, offset)
+            offset += _LEVEL.size
+            level = array("d")
+            level.frombytes(blob[offset:offset + 8 * count])
+            offset += 8 * count
+            sketch.levels.append(level.tolist())
+        sketch._size = sum(len(level) for level in sketch.levels)
+        return sketch
@@ -0,0 +1,291 @@
+"""
+Run store — finished runs on local disk
+SQLite in WAL mode: one row per run plus one row per scored variable,
+indexed on lens, zone and time. The rollup tables (rollups.py), the
+percentile sketches (norms.py) and, for runs with a user key, that
+user's trends (trends.py) are updated in the same transaction as the
+inserts, after them: the write lock is already held by then, so
+processes sharing a store fold into the same aggregates instead of
+interleaving read-modify-writes, and the aggregates never disagree
+with the runs they were built from. Each run is stamped with the scoring config version that scored it
+(scoreconfig.py), which backfill.py uses to re-score after a change.
+record() only enqueues; a background writer drains the queue and
+inserts in batches, so the results page never waits on disk. Readers
+use their own connections and are not blocked by the writer.
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from . import metrics, norms, rollups, scoreconfig, trends
+from .scoring import zone_name
+
+DEFAULT_PATH = os.environ.get("WEATHER_RUN_STORE", "runs.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    lens TEXT NOT NULL,
+    bank_version TEXT,
+    overall REAL NOT NULL,
+    zone TEXT NOT NULL,
+    lever TEXT,
+    answers TEXT NOT NULL,
+    config_version TEXT
+);
+CREATE TABLE IF NOT EXISTS run_variables (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    variable TEXT NOT NULL,
+    pct REAL NOT NULL,
+    zone TEXT NOT NULL,
+    volatility REAL NOT NULL,
+    PRIMARY KEY (run_id, variable)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_ts ON runs(ts);
+CREATE INDEX IF NOT EXISTS runs_lens_ts ON runs(lens, ts);
+CREATE INDEX IF NOT EXISTS runs_zone_ts ON runs(zone, ts);
+CREATE INDEX IF NOT EXISTS run_variables_zone ON run_variables(variable, zone);
+""" + rollups.SCHEMA + norms.SCHEMA + trends.SCHEMA + scoreconfig.SCHEMA
+
+WRITE_ATTEMPTS = 3   # tries per batch on a locked/busy/full database before giving up
+RETRY_DELAY = 0.2    # seconds before the second try, doubling after
+
+_STOP = object()
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def write_with_retry(conn, write, attempts=WRITE_ATTEMPTS):
+    """
+    Run write(conn) in one transaction, retrying sqlite3.OperationalError
+    (locked, busy, disk full) with backoff. Returns None once it commits,
+    else the last error; never raises, so a writer thread survives it.
+    """
+    for attempt in range(attempts):
+        try:
+            with conn:
+                write(conn)
+            return None
+        except sqlite3.OperationalError as e:
+            error = e
+            if attempt + 1 < attempts:
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+        except Exception as e:  # a bad row: retrying cannot help
+            return e
+    return error
+
+
+def migrate(conn):
+    """Bring a store created by an older version up to SCHEMA (run inside a transaction)."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    if "config_version" not in columns:
+        conn.execute("ALTER TABLE runs ADD COLUMN config_version TEXT")  # NULL: scored before versioning
+    conn.execute("CREATE INDEX IF NOT EXISTS runs_lens_config ON runs(lens, config_version)")
+
+
+class RunStore:
+    def __init__(self, path=DEFAULT_PATH, batch_size=256, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.config = scoreconfig.current_config()
+
+        conn = connect(path)
+        with conn:
+            conn.executescript(SCHEMA)
+            migrate(conn)
+            scoreconfig.register(conn, self.config, time.time())
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = threading.Thread(target=self._write_loop, name="run-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --------------------------
+    # Write (non-blocking)
+    # --------------------------
+    def record(self, lens, bank_version, answers, overall, per_variable, lever=None, ts=None, user=None):
+        """
+        Queue one finished run; returns immediately. lever: the Smallest
+        lever's qid. user: a stable user key to fold the run into their trends.
+        """
+        self._queue.put((
+            time.time() if ts is None else ts,
+            lens,
+            bank_version,
+            float(overall),
+            zone_name(overall),
+            lever,
+            json.dumps(answers, separators=(",", ":")),
+            [(v, info["pct"], info["zone"], info["volatility"]) for v, info in per_variable.items()],
+            trends.user_hash(user) if user else None,
+            self.config.version,
+        ))
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                # take whatever else arrives within flush_interval, up to batch_size
+                deadline = time.monotonic() + self.flush_interval
+                while item is not _STOP and len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                runs = [b for b in batch if b is not _STOP]
+                try:
+                    if runs:
+                        self._commit(conn, runs)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if item is _STOP:
+                    return
+        finally:
+            conn.close()
+
+    def _commit(self, conn, runs):
+        """Write one batch; if it fails, write its runs one by one and drop (and report) only those that fail."""
+        error = write_with_retry(conn, lambda c: self._write_batch(c, runs))
+        if error is None:
+            return
+        written = 0
+        if len(runs) > 1:
+            for run in runs:
+                written += write_with_retry(conn, lambda c: self._write_batch(c, [run]), attempts=1) is None
+        dropped = len(runs) - written
+        metrics.count("store.runs_dropped", dropped)
+        print(f"run store: dropped {dropped} of {len(runs)} runs: {error}", file=sys.stderr)
+
+    def _write_batch(self, conn, runs):
+        for ts, lens, bank_version, overall, zone, lever, answers, variables, _, config_version in runs:
+            cur = conn.execute(
+                "INSERT INTO runs (ts, lens, bank_version, overall, zone, lever, answers, config_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ts, lens, bank_version, overall, zone, lever, answers, config_version),
+            )
+            conn.executemany(
+                "INSERT INTO run_variables (run_id, variable, pct, zone, volatility) VALUES (?, ?, ?, ?, ?)",
+                [(cur.lastrowid, *row) for row in variables],
+            )
+        finished = [
+            (ts, lens, overall, zone, lever, variables)
+            for ts, lens, _, overall, zone, lever, _, variables, _, _ in runs
+        ]
+        rollups.update_rollups(conn, finished)
+        norms.update_norms(conn, finished)
+        trends.update_trends(conn, [
+            (ts, user, lens, overall, [(v, pct) for v, pct, _, _ in variables])
+            for ts, lens, _, overall, _, _, _, variables, user, _ in runs
+            if user is not None
+        ])
+
+    # --------------------------
+    # Query
+    # --------------------------
+    def reader(self):
+        """This thread's read connection (also what rollups' queries take)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    @staticmethod
+    def _where(lens=None, zone=None, variable=None, since=None, until=None):
+        """
+        zone filters the overall zone, or the zone of `variable` when one is
+        given (e.g. variable="Clarity", zone="RED").
+        """
+        clauses, params = [], []
+        if lens is not None:
+            clauses.append("r.lens = ?")
+            params.append(lens)
+        if since is not None:
+            clauses.append("r.ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.ts < ?")
+            params.append(until)
+        if variable is not None:
+            sub = "SELECT run_id FROM run_variables WHERE variable = ?"
+            params.append(variable)
+            if zone is not None:
+                sub += " AND zone = ?"
+                params.append(zone)
+            clauses.append(f"r.id IN ({sub})")
+        elif zone is not None:
+            clauses.append("r.zone = ?")
+            params.append(zone)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, lens=None, zone=None, variable=None, since=None, until=None, limit=100):
+        """Newest first, without per-variable detail (see get())."""
+        where, params = self._where(lens, zone, variable, since, until)
+        rows = self.reader().execute(
+            f"SELECT r.id, r.ts, r.lens, r.bank_version, r.config_version, r.overall, r.zone, r.lever FROM runs r{where} "
+            "ORDER BY r.ts DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, lens=None, zone=None, variable=None, since=None, until=None):
+        where, params = self._where(lens, zone, variable, since, until)
+        return self.reader().execute(f"SELECT COUNT(*) FROM runs r{where}", params).fetchone()[0]
+
+    def user_trends(self, user, lens):
+        """variable -> trends.Trend for a user key and lens, as of the last written run."""
+        return trends.load_trends(self.reader(), trends.user_hash(user), lens)
+
+    def get(self, run_id):
+        """One run with answers and per_variable, or None."""
+        conn = self.reader()
+        row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run["answers"] = json.loads(run["answers"])
+        run["per_variable"] = {
+            r["variable"]: {"pct": r["pct"], "zone": r["zone"], "volatility": r["volatility"]}
+            for r in conn.execute(
+                "SELECT variable, pct, zone, volatility FROM run_variables WHERE run_id = ?", (run_id,)
+            )
+        }
+        return run
+
+
+def shared_store(path=DEFAULT_PATH):
+    """The process-wide RunStore for `path` (one writer thread per file)."""
+    with _shared_lock:
+        store = _shared.get(path)
+        if store is None:
+            store = _shared[path] = RunStore(path)
+        return store
@@ -0,0 +1,131 @@
+"""
+Trends — each user's scores across retakes, kept as running aggregates
+One row per (user, lens, variable), plus rollups.OVERALL for the overall
+score: runs taken, the last pct, the change at the last run, an EWMA,
+and the two running sums that give the least-squares slope over run
+number (x = 1..n, so sum x and sum x^2 are closed form). A new run is
+an O(1) Trend.after(); nothing rescans a user's history.
+
+RunStore's writer folds runs that carry a user key into these rows
+(see store.py). The results page reads the user's rows for one lens, a
+primary key range of at most a few rows, and applies the run it is
+showing.
+User keys are stored hashed.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+from .rollups import OVERALL
+
+ALPHA = 0.3   # EWMA weight of the newest run
+FLAT = 0.5    # |slope| in points per run below which a trend reads as flat
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_trends (
+    user TEXT NOT NULL,
+    lens TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    last REAL NOT NULL,
+    delta REAL,
+    ewma REAL NOT NULL,
+    sum_y REAL NOT NULL,
+    sum_xy REAL NOT NULL,
+    PRIMARY KEY (user, lens, variable)
+) WITHOUT ROWID;
+"""
+
+
+def user_hash(key: str) -> str:
+    """What is stored for a user key (an account id, email or browser id)."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass(frozen=True)
+class Trend:
+    n: int
+    ts: float
+    last: float
+    delta: float      # last - the run before it; None after one run
+    ewma: float
+    sum_y: float
+    sum_xy: float
+
+    @classmethod
+    def first(cls, pct, ts):
+        return cls(1, ts, pct, None, pct, pct, pct)
+
+    def after(self, pct, ts) -> "Trend":
+        n = self.n + 1
+        return Trend(
+            n, ts, pct, pct - self.last,
+            ALPHA * pct + (1 - ALPHA) * self.ewma,
+            self.sum_y + pct, self.sum_xy + n * pct,
+        )
+
+    @property
+    def slope(self):
+        """Least-squares points per run over every run so far; None before the second."""
+        n = self.n
+        if n < 2:
+            return None
+        sx = n * (n + 1) / 2
+        sxx = n * (n + 1) * (2 * n + 1) / 6
+        return (n * self.sum_xy - sx * self.sum_y) / (n * sxx - sx * sx)
+
+
+def arrow(slope):
+    """▲ / ▼ / ▶ for a slope in points per run ("" with no slope yet)."""
+    if slope is None:
+        return ""
+    return "▲" if slope >= FLAT else "▼" if slope <= -FLAT else "▶"
+
+
+def advance(trend, pct, ts):
+    """trend after one more run (trend may be None: the user's first)."""
+    return Trend.first(pct, ts) if trend is None else trend.after(pct, ts)
+
+
+# --------------------------
+# Update
+# --------------------------
+def update_trends(conn, runs):
+    """runs: (ts, user, lens, overall, variables) with variables as [(variable, pct), ...]; user already hashed."""
+    cache = {}
+    for ts, user, lens, overall, variables in runs:
+        if user is None:
+            continue
+        if (user, lens) not in cache:
+            cache[user, lens] = load_trends(conn, user, lens)
+        trends = cache[user, lens]
+        for v, pct in [(OVERALL, overall), *variables]:
+            trends[v] = advance(trends.get(v), pct, ts)
+    conn.executemany(
+        "INSERT INTO user_trends (user, lens, variable, n, ts, last, delta, ewma, sum_y, sum_xy) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (user, lens, variable) DO UPDATE SET n = excluded.n, ts = excluded.ts, "
+        "last = excluded.last, delta = excluded.delta, ewma = excluded.ewma, "
+        "sum_y = excluded.sum_y, sum_xy = excluded.sum_xy",
+        [
+            (user, lens, v, t.n, t.ts, t.last, t.delta, t.ewma, t.sum_y, t.sum_xy)
+            for (user, lens), trends in cache.items()
+            for v, t in trends.items()
+        ],
+    )
+
+
+# --------------------------
+# Query
+# --------------------------
+def load_trends(conn, user, lens):
+    """variable -> Trend for one (hashed) user and lens; {} for a first run."""
+    return {
+        v: Trend(n, ts, last, delta, ewma, sum_y, sum_xy)
+        for v, n, ts, last, delta, ewma, sum_y, sum_xy in conn.execute(
+            "SELECT variable, n, ts, last, delta, ewma, sum_y, sum_xy FROM user_trends "
+            "WHERE user = ? AND lens = ?",
+            (user, lens),
+        )
+    }
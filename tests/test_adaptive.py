@@ -0,0 +1,67 @@
+"""
+Adaptive flow — ask only what can still move a zone
+- flip_probability is 0 with no uncertainty and about one half on a cut
+- thin variables are covered first, answered questions are never asked
+  again, and a fully answered run is settled
+- consistent answers stop early with every variable at
+  min_per_variable answers and below the flip threshold
+    python -m pytest -q tests
+"""
+
+import random
+
+import pytest
+
+from src.adaptive import ZONE_CUTS, AdaptiveSelector, flip_probability
+from src.bank import BANKS
+from src.sampling import sample_positions
+
+LENSES = list(BANKS)
+
+
+def run_questions(bank, seed):
+    return [bank.question(p) for p in sample_positions(bank, 25, seed=seed)]
+
+def walk(selector, answer):
+    """Answer next_question() until it stops; the qids in asking order."""
+    answers, asked = {}, []
+    while (pos := selector.next_question(answers)) is not None:
+        q = selector.questions[pos]
+        assert q["id"] not in answers
+        answers[q["id"]] = answer(q)
+        asked.append(q["id"])
+    return answers, asked
+
+
+def test_flip_probability():
+    assert flip_probability(50.0, 0.0) == 0.0
+    for cut in ZONE_CUTS:
+        assert flip_probability(cut + 1e-9, 5.0) == pytest.approx(0.5, abs=0.01)
+    assert flip_probability(ZONE_CUTS[0] - 20, 2.0) < 1e-6
+    assert flip_probability(ZONE_CUTS[0] - 10, 8.0) > flip_probability(ZONE_CUTS[0] - 10, 4.0)
+
+@pytest.mark.parametrize("lens", LENSES)
+def test_consistent_answers_stop_early(lens):
+    bank = BANKS[lens]
+    for seed in range(20):
+        selector = AdaptiveSelector(run_questions(bank, seed))
+        variables = set(selector.total_weight)
+        answers, asked = walk(selector, lambda q: 0 if q.get("reverse") else 4)
+        assert selector.saved(answers) > 0
+        state = selector.variable_state(answers)
+        assert all(info["n"] >= selector.min_per_variable or info["remaining"] == 0 for info in state.values())
+        assert all(info["p_flip"] <= selector.alpha or info["remaining"] == 0 for info in state.values())
+        # the first questions cover every variable before any gets a third
+        first = [q["variable"] for q in selector.questions if q["id"] in asked[: len(variables)]]
+        assert set(first) == variables
+
+@pytest.mark.parametrize("lens", LENSES)
+def test_mixed_answers_settle(lens):
+    bank = BANKS[lens]
+    rng = random.Random(8)
+    for seed in range(20):
+        selector = AdaptiveSelector(run_questions(bank, seed))
+        answers, _ = walk(selector, lambda q: rng.randrange(5))
+        assert selector.is_settled(answers)
+    everything = {q["id"]: 2 for q in selector.questions}
+    assert selector.next_question(everything) is None and selector.saved(everything) == 0
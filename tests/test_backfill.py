@@ -0,0 +1,73 @@
+"""
+Backfill — re-scoring must agree with what finish_run stored
+- a backfill with nothing to change changes nothing
+- re-scoring runs stored before versioning reproduces their stored
+  scores, zones and levers, each run summed in its own question order
+
+Fixtures are stored the way app.finish_run stores them: scored over
+run.questions(), answers in run order, lever from rank_levers.
+    python -m pytest -q tests
+"""
+
+import random
+import sqlite3
+
+from src.backfill import backfill
+from src.bank import BANKS
+from src.scoring import compute_scores
+from src.sensitivity import rank_levers
+from src.session import RunState
+from src.store import RunStore
+
+
+def store_runs(path, n, seed):
+    store = RunStore(path, batch_size=500)
+    rng = random.Random(seed)
+    for lens, bank in BANKS.items():
+        for _ in range(n):
+            run = RunState(bank, rng.sample(range(len(bank)), min(25, len(bank))))
+            for slot in range(len(run)):
+                if rng.random() >= 0.1:
+                    run.set_answer(slot, rng.randrange(5))
+            answers = run.answer_dict()
+            if not answers:
+                continue
+            overall, per_variable, scored_qs_sorted = compute_scores(run.questions(), answers, bank=bank)
+            levers = rank_levers(scored_qs_sorted, per_variable, order=answers)
+            store.record(
+                lens, bank.version, answers, overall, per_variable,
+                lever=levers[0][0][3]["id"] if levers else None,
+            )
+    store.close()
+
+def snapshot(path):
+    conn = sqlite3.connect(path)
+    try:
+        return (
+            conn.execute("SELECT id, lens, overall, zone, lever, answers, config_version FROM runs ORDER BY id").fetchall(),
+            conn.execute("SELECT * FROM run_variables ORDER BY run_id, variable").fetchall(),
+        )
+    finally:
+        conn.close()
+
+
+def test_backfill_without_changes_is_a_no_op(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    store_runs(path, 200, seed=4)
+    before = snapshot(path)
+
+    assert set(backfill(path, chunk_size=64).values()) == {0}
+    assert snapshot(path) == before
+
+def test_backfill_of_unversioned_runs_reproduces_them(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    store_runs(path, 1000, seed=6)
+    before = snapshot(path)
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE runs SET config_version = NULL WHERE id % 3 = 0")
+    conn.close()
+    stats = backfill(path, chunk_size=64)
+    assert sum(stats.values()) == sum(1 for row in before[0] if row[0] % 3 == 0)
+    assert snapshot(path) == before
@@ -0,0 +1,65 @@
+"""
+Batch scoring — the vectorized path must agree with compute_scores
+- BatchScorer.score matches compute_scores bit for bit, in bank order
+  and in each run's own question order
+
+Randomized with fixed seeds, over every loaded lens.
+    python -m pytest -q tests
+"""
+
+import random
+
+import pytest
+
+from src.bank import BANKS
+from src.batch import BatchScorer
+from src.scoring import compute_scores
+from src.sensitivity import rank_levers
+from src.session import RunState
+
+LENSES = list(BANKS)
+
+
+def random_answers(bank, rng, k=25, skip=0.1):
+    positions = rng.sample(range(len(bank)), min(k, len(bank)))
+    return {bank.ids[p]: rng.randrange(5) for p in positions if rng.random() >= skip}
+
+
+# --------------------------
+# BatchScorer == compute_scores
+# --------------------------
+@pytest.mark.parametrize("lens", LENSES)
+def test_batch_matches_compute_scores(lens):
+    bank = BANKS[lens]
+    rng = random.Random(1)
+    runs = [random_answers(bank, rng) for _ in range(300)]
+    runs.append({})  # nothing answered
+    scorer = BatchScorer.from_bank(bank)
+    scores = scorer.score(scorer.answer_matrix(runs))
+    for i, answers in enumerate(runs):
+        overall, per_variable, _ = compute_scores(bank.questions, answers, bank=bank)
+        assert scores.row(i) == (overall, per_variable)
+
+@pytest.mark.parametrize("lens", LENSES)
+def test_batch_matches_compute_scores_in_run_order(lens):
+    bank = BANKS[lens]
+    rng = random.Random(5)
+    runs = []
+    for _ in range(1000):
+        run = RunState(bank, rng.sample(range(len(bank)), min(25, len(bank))))
+        for slot in range(len(run)):
+            if rng.random() >= 0.1:
+                run.set_answer(slot, rng.randrange(5))
+        runs.append(run)
+    scorer = BatchScorer.from_bank(bank)
+    matrix = scorer.answer_matrix(run.answer_dict() for run in runs)
+    ranks = scorer.rank_matrix([q["id"] for q in run.questions()] for run in runs)
+    scores = scorer.score(matrix, ranks)
+    levers = scorer.levers(matrix, scores, ranks).ranked[:, 0].tolist()
+    for i, run in enumerate(runs):
+        questions = run.questions()
+        overall, per_variable, scored_qs_sorted = compute_scores(questions, run.answer_dict(), bank=bank)
+        assert scores.row(i) == (overall, per_variable)
+        assert [bank.ids[j] for j in scores.ranked[i].tolist() if j >= 0] == [t[3]["id"] for t in scored_qs_sorted]
+        ranked = rank_levers(scored_qs_sorted, per_variable, order=[q["id"] for q in questions])
+        assert (bank.ids[levers[i]] if levers[i] >= 0 else None) == (ranked[0][0][3]["id"] if ranked else None)
@@ -0,0 +1,52 @@
+"""
+Checkpoints — in-progress runs that survive reloads and other workers
+- the latest save wins, before and after the writer flushes it
+- another process on the same store loads what this one wrote
+- drop() removes a checkpoint; expired rows are neither loaded nor kept
+    python -m pytest -q tests
+"""
+
+import sqlite3
+import time
+
+from src.checkpoints import Checkpoints
+
+
+def test_latest_save_wins_across_processes(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    here = Checkpoints(path, flush_interval=0.01)
+    rid = Checkpoints.new_id()
+    here.save(rid, "token-1")
+    here.save(rid, "token-2")
+    assert here.load(rid) == "token-2"  # still pending
+    here.flush()
+    assert here.count() == 1
+
+    elsewhere = Checkpoints(path, flush_interval=0.01)
+    assert elsewhere.load(rid) == "token-2"
+    assert elsewhere.load(Checkpoints.new_id()) is None
+
+    here.drop(rid)
+    assert here.load(rid) is None
+    here.flush()
+    assert elsewhere.load(rid) is None and elsewhere.count() == 0
+    here.close()
+    elsewhere.close()
+
+def test_expired_checkpoints(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    checkpoints = Checkpoints(path, flush_interval=0.01, max_age=60)
+    checkpoints.save("old", "token-old")
+    checkpoints.save("new", "token-new")
+    checkpoints.flush()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE checkpoints SET ts = ? WHERE id = 'old'", (time.time() - 120,))
+    assert checkpoints.load("old") is None
+    assert checkpoints.load("new") == "token-new"
+
+    with conn:
+        Checkpoints._write_batch(conn, {}, max_age=60)
+    assert [rid for (rid,) in conn.execute("SELECT id FROM checkpoints")] == ["new"]
+    conn.close()
+    checkpoints.close()
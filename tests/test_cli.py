@@ -0,0 +1,73 @@
+"""
+Headless scoring — record parsing and validation
+- checked_run takes only real ints 0..4 for known ids of a known lens,
+  and says what is wrong with anything else
+- CSV rows parse from per-question columns, an answers column or a
+  token column
+- score_stream reports bad records in input order, with or without
+  workers
+    python -m pytest -q tests
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from src.bank import BANKS
+from src.cli import checked_run, parse_item, read_items, score_record, score_stream
+
+LENS = "Financial"
+QIDS = BANKS[LENS].ids
+
+
+def test_checked_run_accepts_ints():
+    bank, answers = checked_run({"lens": LENS, "answers": {QIDS[0]: 0, QIDS[1]: 4}})
+    assert bank is BANKS[LENS] and answers == {QIDS[0]: 0, QIDS[1]: 4}
+    assert checked_run({"lens": LENS, "answers": None})[1] == {}
+
+@pytest.mark.parametrize("record, message", [
+    ({"lens": "Nope", "answers": {}}, "unknown lens"),
+    ({"lens": LENS, "answers": {"zz": 1}}, "unknown question id 'zz'"),
+    ({"lens": LENS, "answers": {QIDS[0]: True}}, "True is not an integer 0..4"),
+    ({"lens": LENS, "answers": {QIDS[0]: 3.0}}, "3.0 is not an integer 0..4"),
+    ({"lens": LENS, "answers": {QIDS[0]: "3"}}, "'3' is not an integer 0..4"),
+    ({"lens": LENS, "answers": {QIDS[0]: 5}}, "5 is not an integer 0..4"),
+    ({"lens": LENS, "answers": {QIDS[0]: -1}}, "-1 is not an integer 0..4"),
+    ({"lens": LENS, "answers": [1, 2]}, "answers must be an object"),
+    ({"lens": LENS, "answers": "f01=3"}, "answers must be an object"),
+])
+def test_checked_run_rejects(record, message):
+    with pytest.raises(ValueError, match=message):
+        checked_run(record)
+
+
+def csv_rows(*rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(dict.fromkeys(k for row in rows for k in row)))
+    writer.writeheader()
+    writer.writerows(rows)
+    return list(read_items(io.StringIO(out.getvalue()), "csv"))
+
+def test_csv_rows():
+    by_column, by_json, bad = csv_rows(
+        {"lens": LENS, QIDS[0]: "3", QIDS[1]: ""},
+        {"lens": LENS, "answers": json.dumps({QIDS[1]: 2}), "q_order": json.dumps([QIDS[1]])},
+        {"lens": LENS, QIDS[0]: "3.5"},
+    )
+    assert parse_item(by_column, "csv") == {"lens": LENS, "answers": {QIDS[0]: 3}}
+    assert parse_item(by_json, "csv") == {"lens": LENS, "answers": {QIDS[1]: 2}, "q_order": [QIDS[1]]}
+    with pytest.raises(ValueError, match="'3.5' is not an integer 0..4"):
+        parse_item(bad, "csv")
+    [token_row] = csv_rows({"lens": "", "token": "abc"})
+    assert parse_item(token_row, "csv") == {"token": "abc"}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_stream_reports_errors_in_order(workers):
+    good = {"lens": LENS, "answers": {QIDS[0]: 1, QIDS[2]: 4}}
+    lines = [json.dumps(good), json.dumps({"lens": LENS, "answers": {QIDS[0]: True}}), "[]", json.dumps(good)]
+    results = list(score_stream(lines, "jsonl", workers=workers, chunk_size=1))
+    assert [json.loads(out) if out else None for out, _ in results] == [score_record(good), None, None, score_record(good)]
+    assert [error is not None for _, error in results] == [False, True, True, False]
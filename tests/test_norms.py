@@ -0,0 +1,85 @@
+"""
+Norms — KLL quantile sketches and the percentiles read from them
+- a sketch keeps its total weight and stays within its rank error
+- merged partial sketches answer like one sketch over everything
+- a sketch survives to_bytes()/from_bytes()
+- Norms stays quiet below MIN_POPULATION and reads the store's sketches
+    python -m pytest -q tests
+"""
+
+import math
+import random
+import sqlite3
+
+from src.norms import MIN_POPULATION, SCHEMA, Norms, update_norms
+from src.rollups import OVERALL
+from src.sketch import QuantileSketch
+
+RANK_ERROR = 0.03  # about 1.7/k for k=200, with room for the random compaction
+
+
+def exact_rank(values, x):
+    below = sum(v < x for v in values)
+    ties = sum(v == x for v in values)
+    return (below + ties / 2) / len(values)
+
+def population(seed, n):
+    rng = random.Random(seed)
+    return [round(rng.gauss(60, 15), 1) for _ in range(n)]
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch()
+    assert math.isnan(sketch.rank(50.0)) and math.isnan(sketch.quantile(0.5))
+
+def test_rank_error_is_bounded():
+    values = population(1, 50000)
+    sketch = QuantileSketch()
+    sketch.extend(values)
+    assert sketch.n == len(values) == sketch.view()[1][-1]
+    assert len(sketch.view()[0]) < 4 * sketch.k  # items kept, not n
+    assert (sketch.min, sketch.max) == (min(values), max(values))
+    for x in (20.0, 45.0, 60.0, 75.0, 100.0):
+        assert abs(sketch.rank(x) - exact_rank(values, x)) < RANK_ERROR
+
+def test_merged_partials_match_the_whole():
+    values = population(2, 30000)
+    parts = [QuantileSketch() for _ in range(3)]
+    for i, part in enumerate(parts):
+        part.extend(values[i::3])
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    assert merged.n == len(values)
+    for x in (30.0, 60.0, 90.0):
+        assert abs(merged.rank(x) - exact_rank(values, x)) < RANK_ERROR
+
+def test_bytes_round_trip():
+    sketch = QuantileSketch()
+    sketch.extend(population(3, 5000))
+    back = QuantileSketch.from_bytes(sketch.to_bytes())
+    assert (back.k, back.n, back.min, back.max) == (sketch.k, sketch.n, sketch.min, sketch.max)
+    assert back.view() == sketch.view()
+
+
+class FakeStore:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def reader(self):
+        return self.conn
+
+def test_norms_percentiles(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "norms.sqlite3"))
+    conn.executescript(SCHEMA)
+    norms = Norms(FakeStore(conn), max_age=0.0)
+    scores = population(4, MIN_POPULATION - 1)
+    runs = [(0.0, "Financial", s, "YELLOW", None, [("Baseline", s, "YELLOW", 0.0)]) for s in scores]
+    with conn:
+        update_norms(conn, runs)
+    assert norms.population("Financial") == MIN_POPULATION - 1
+    assert norms.percentile("Financial", OVERALL, 60.0) is None
+
+    with conn:
+        update_norms(conn, runs[:1])
+    assert norms.population("Financial", "Baseline") == MIN_POPULATION
+    assert abs(norms.lookup("Financial")(OVERALL, 60.0) - 100 * exact_rank(scores + scores[:1], 60.0)) < 1e-9
+    assert norms.percentile("Interpersonal", OVERALL, 60.0) is None
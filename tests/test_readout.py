@@ -0,0 +1,20 @@
+"""
+Readout — the markdown report for one run
+    python -m pytest -q tests
+"""
+
+from src.readout import build_readout
+from src.scoring import VARIABLE_WEIGHTS, compute_scores
+
+
+def test_lever_outside_variable_weights():
+    known = next(iter(VARIABLE_WEIGHTS))
+    questions = [
+        {"id": "k1", "variable": known, "text": "Known item", "weight": 1.0},
+        {"id": "x1", "variable": "Extra", "text": "Extra item", "weight": 1.0},
+    ]
+    answers = {"k1": 4, "x1": 0}
+    overall, per_variable, scored_qs_sorted = compute_scores(questions, answers)
+    readout = build_readout("Financial", overall, per_variable, scored_qs_sorted, answers)
+    assert readout.lever.id == "x1"
+    assert "**Do this first:** Extra item" in readout.markdown
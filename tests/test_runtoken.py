@@ -0,0 +1,74 @@
+"""
+Run tokens — a token decodes to the run it was encoded from
+- and re-encodes to the same token, for guided and adaptive runs,
+  finished or not, over every loaded lens and a bank too large for
+  16-bit positions
+
+Randomized with fixed seeds.
+    python -m pytest -q tests
+"""
+
+import random
+
+import pytest
+
+from src.bank import BANKS, compile_lens
+from src.runtoken import TokenError, decode_run, encode_run
+from src.session import RunState
+
+LENSES = list(BANKS)
+
+
+def random_run(bank, rng):
+    run = RunState(bank, rng.sample(range(len(bank)), min(25, len(bank))), adaptive=rng.random() < 0.3)
+    run.asked.extend(range(rng.randint(1, len(run)) if run.adaptive else len(run)))
+    run.idx = rng.randrange(len(run.asked))
+    for slot in range(len(run)):
+        if rng.random() < 0.8:
+            run.set_answer(slot, rng.randrange(5))
+    return run
+
+def assert_round_trip(run, finished):
+    token = encode_run(run, finished=finished)
+    back, back_finished = decode_run(token)
+    assert back_finished == finished
+    assert (back.lens, back.version, back.adaptive, back.idx) == (run.lens, run.version, run.adaptive, run.idx)
+    assert list(back.order) == list(run.order)
+    assert back.answers == run.answers
+    assert list(back.asked) == list(run.asked)
+    assert back.preview() == run.preview()
+    assert encode_run(back, finished=finished) == token
+
+@pytest.mark.parametrize("lens", LENSES)
+def test_token_round_trip(lens):
+    rng = random.Random(2)
+    for _ in range(300):
+        assert_round_trip(random_run(BANKS[lens], rng), rng.random() < 0.5)
+
+def test_token_round_trip_large_bank(monkeypatch):
+    import src.runtoken
+    import src.session
+
+    base = BANKS["Financial"].questions
+    questions = [dict(base[i % len(base)], id=f"big-{i}") for i in range(70000)]
+    bank = compile_lens("Financial (large)", questions)
+    banks = {**BANKS, bank.lens: bank}
+    monkeypatch.setattr(src.runtoken, "BANKS", banks)
+    monkeypatch.setattr(src.session, "BANKS", banks)
+    rng = random.Random(3)
+    for _ in range(20):
+        assert_round_trip(random_run(bank, rng), rng.random() < 0.5)
+
+def test_bad_tokens_are_rejected():
+    bank = BANKS[LENSES[0]]
+    token = encode_run(random_run(bank, random.Random(4)), finished=True)
+    for bad in ("", "not a token!", token[:-3], token + "AAAA", "A" * len(token)):
+        with pytest.raises(TokenError):
+            decode_run(bad)
+
+def test_unfinished_adaptive_token_needs_a_question():
+    run = RunState(BANKS[LENSES[0]], list(range(10)), adaptive=True)
+    with pytest.raises(TokenError):
+        decode_run(encode_run(run, finished=False))
+    back, finished = decode_run(encode_run(run, finished=True))
+    assert finished and list(back.asked) == []
@@ -0,0 +1,56 @@
+"""
+Sampling — stratified draws over bank positions
+- quotas add up to k, give every variable one question when k allows,
+  follow each variable's share of the bank and never exceed its size
+- a draw is distinct bank positions matching the quotas, and a seed
+  reproduces it
+    python -m pytest -q tests
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from src.bank import BANKS, compile_lens
+from src.sampling import quotas, sample_positions
+
+LENSES = list(BANKS)
+
+
+def skewed_bank():
+    base = BANKS["Financial"].questions
+    variables = sorted({q["variable"] for q in base})
+    questions = [dict(base[0], id=f"s{i}", variable=variables[0]) for i in range(200)]
+    questions += [dict(base[0], id=f"t{i}", variable=v) for i, v in enumerate(variables[1:])]
+    return compile_lens("Skewed", questions)
+
+
+@pytest.mark.parametrize("k", [1, 3, 6, 25, 10000])
+def test_quotas(k):
+    for bank in [*BANKS.values(), skewed_bank()]:
+        q = dict(quotas(bank, k))
+        sizes = {v: len(pos) for v, pos in bank.by_variable.items()}
+        assert sum(q.values()) == min(k, len(bank))
+        assert all(0 <= q[v] <= sizes[v] for v in sizes)
+        if k >= len(sizes):
+            assert all(n >= 1 for n in q.values())
+        # within one question of the variable's proportional share
+        rest = min(k, len(bank)) - (len(sizes) if k >= len(sizes) else 0)
+        spare = sum(sizes.values()) - (len(sizes) if k >= len(sizes) else 0)
+        for v, n in q.items():
+            floor = 1 if k >= len(sizes) else 0
+            assert abs(n - floor - rest * (sizes[v] - floor) / spare) < 1
+
+@pytest.mark.parametrize("lens", LENSES)
+def test_draws(lens):
+    bank = BANKS[lens]
+    expected = dict(quotas(bank, 25))
+    for seed in range(50):
+        picks = sample_positions(bank, 25, seed=seed)
+        assert len(set(picks)) == len(picks) == min(25, len(bank))
+        assert Counter(bank.question(p)["variable"] for p in picks) == Counter(
+            {v: n for v, n in expected.items() if n}
+        )
+        assert sample_positions(bank, 25, seed=seed) == picks
+        assert sample_positions(bank, 25, seed=random.Random(seed)) == picks
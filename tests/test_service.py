@@ -0,0 +1,135 @@
+"""
+Scoring service — batch scoring and HTTP request handling
+- score_batch gives the same record score_record does, in bank order,
+  q_order and token (run) order
+- requests are framed and rejected the way the module docstring says
+
+Requests go through a real asyncio server on a free port.
+    python -m pytest -q tests
+"""
+
+import asyncio
+import json
+import random
+
+from src.bank import BANKS
+from src.cli import score_record
+from src.runtoken import encode_run
+from src.service import ScoringService, score_batch
+from src.session import RunState
+
+
+def random_records(rng, n):
+    for _ in range(n):
+        lens, bank = rng.choice(list(BANKS.items()))
+        run = RunState(bank, rng.sample(range(len(bank)), min(25, len(bank))))
+        for slot in range(len(run)):
+            if rng.random() >= 0.1:
+                run.set_answer(slot, rng.randrange(5))
+        kind = rng.randrange(3)
+        if kind == 0:
+            yield {"token": encode_run(run, finished=True)}
+        elif kind == 1:
+            yield {"lens": lens, "answers": run.answer_dict(), "q_order": [q["id"] for q in run.questions()]}
+        else:
+            yield {"lens": lens, "answers": run.answer_dict()}
+
+
+def test_score_batch_matches_score_record():
+    records = list(random_records(random.Random(7), 600))
+    records += [
+        {"lens": "Nope", "answers": {}},
+        {"lens": "Financial", "answers": {"f01": 5}},
+        {"lens": "Financial", "answers": {"f01": 1}, "q_order": ["zz"]},
+        {"lens": "Financial", "answers": []},
+    ]
+    for record, (out, error) in zip(records, score_batch(records)):
+        try:
+            expected = score_record(record)
+        except (ValueError, TypeError, AttributeError):
+            assert out is None and error
+        else:
+            assert error is None
+            assert out == expected
+
+
+# --------------------------
+# HTTP
+# --------------------------
+def exchange(*raw):
+    """Send each raw request on one connection; [(status, headers, body)] for the replies read."""
+    async def go():
+        service = ScoringService()
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        replies = []
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for request in raw:
+                writer.write(request)
+                await writer.drain()
+                status = await reader.readline()
+                if not status:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    k, _, v = line.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers["content-length"]))
+                replies.append((int(status.split()[1]), headers, json.loads(body) if body else None))
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.batcher.close()
+        return replies
+    return asyncio.run(go())
+
+def post(path, body, headers=""):
+    return f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n{headers}\r\n".encode() + body
+
+
+def test_score_request():
+    record = {"lens": "Financial", "answers": {"f01": 3, "f02": 1}}
+    [(status, headers, body)] = exchange(post("/score", json.dumps(record).encode()))
+    assert status == 200
+    assert headers["connection"] == "keep-alive"
+    assert body == score_record(record)
+
+def test_bad_requests_keep_the_connection():
+    replies = exchange(
+        post("/score", b"{not json"),
+        post("/score", b"[1, 2]"),
+        post("/score", json.dumps({"lens": "Nope", "answers": {}}).encode()),
+        post("/score/batch", b'{"runs": [1]}'),
+        b"GET /score HTTP/1.1\r\n\r\n",
+        b"GET /nowhere HTTP/1.1\r\n\r\n",
+    )
+    assert [status for status, _, _ in replies] == [400, 400, 400, 400, 405, 404]
+    assert "unknown lens" in replies[2][2]["error"]
+
+def test_unframeable_bodies_close_the_connection():
+    for length in ("-1", "12abc", "１２"):
+        replies = exchange(
+            f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode(),
+            b"GET /banks HTTP/1.1\r\n\r\n",
+        )
+        assert [(status, h["connection"]) for status, h, _ in replies] == [(400, "close")]
+    [(status, headers, _)] = exchange(b"POST /score HTTP/1.1\r\nContent-Length: 999999999\r\n\r\n")
+    assert (status, headers["connection"]) == (413, "close")
+
+def test_bank_etag():
+    lens, bank = next(iter(BANKS.items()))
+    path = f"/banks/{lens.replace(' ', '%20')}"
+    [(status, headers, body)] = exchange(f"GET {path} HTTP/1.1\r\n\r\n".encode())
+    assert status == 200 and body["version"] == bank.version
+    etag = headers["etag"]
+    [(status, _, body)] = exchange(f"GET {path} HTTP/1.1\r\nIf-None-Match: {etag}\r\n\r\n".encode())
+    assert (status, body) == (304, None)
+
+def test_batch_request():
+    runs = [{"lens": "Financial", "answers": {"f01": 2}}, {"lens": "Nope", "answers": {}}]
+    [(status, _, body)] = exchange(post("/score/batch", json.dumps({"runs": runs}).encode()))
+    assert status == 200
+    assert body["results"][0] == score_record(runs[0])
+    assert "error" in body["results"][1]
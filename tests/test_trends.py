@@ -0,0 +1,60 @@
+"""
+Trends — per-user running aggregates across retakes
+- folding runs one at a time gives the least-squares slope, EWMA and
+  last change a full rescan would
+- the run store folds runs that carry a user key, stores the key
+  hashed, and leaves anonymous runs out
+    python -m pytest -q tests
+"""
+
+import sqlite3
+from statistics import linear_regression
+
+import pytest
+
+from src.rollups import OVERALL
+from src.store import RunStore
+from src.trends import ALPHA, FLAT, advance, arrow, user_hash
+
+SCORES = [40.0, 55.5, 52.0, 61.25, 70.0, 68.5]
+
+
+def test_running_aggregates_match_a_rescan():
+    trend = None
+    for i, pct in enumerate(SCORES):
+        trend = advance(trend, pct, ts=float(i))
+        seen = SCORES[: i + 1]
+        assert (trend.n, trend.last, trend.ts) == (len(seen), pct, float(i))
+        if i == 0:
+            assert trend.delta is None and trend.slope is None and arrow(trend.slope) == ""
+            continue
+        assert trend.delta == pytest.approx(pct - SCORES[i - 1])
+        assert trend.slope == pytest.approx(linear_regression(range(1, len(seen) + 1), seen).slope)
+    ewma = SCORES[0]
+    for pct in SCORES[1:]:
+        ewma = ALPHA * pct + (1 - ALPHA) * ewma
+    assert trend.ewma == pytest.approx(ewma)
+
+def test_arrow():
+    assert [arrow(s) for s in (FLAT, FLAT / 2, -FLAT / 2, -FLAT)] == ["▲", "▶", "▶", "▼"]
+
+
+def test_store_folds_users_runs(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    store = RunStore(path)
+    for i, pct in enumerate(SCORES):
+        per_variable = {"Baseline": {"pct": pct, "zone": "YELLOW", "volatility": 0.0}}
+        store.record("Financial", "v", {"f01": 2}, pct, per_variable, ts=float(i), user="someone@example.com")
+        store.record("Financial", "v", {"f01": 2}, 0.0, per_variable, ts=float(i))  # anonymous
+    store.flush()
+    trends = store.user_trends("someone@example.com", "Financial")
+    assert set(trends) == {OVERALL, "Baseline"}
+    assert trends[OVERALL].n == len(SCORES)
+    assert trends[OVERALL].last == SCORES[-1]
+    assert trends[OVERALL].slope == pytest.approx(linear_regression(range(1, len(SCORES) + 1), SCORES).slope)
+    assert store.user_trends("someone@example.com", "Interpersonal") == {}
+    store.close()
+
+    conn = sqlite3.connect(path)
+    assert {u for (u,) in conn.execute("SELECT DISTINCT user FROM user_trends")} == {user_hash("someone@example.com")}
+    conn.close()